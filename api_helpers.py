@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Setup shared by the API scripts (backend_test.py, debug_intersection.py): the host under
+test, the pooled HTTP/2 client and VCR cassette recording. Kept free of pytest so the
+standalone scripts can import it.
+"""
+import contextlib
+import json
+import os
+
+import httpx
+
+# Live host under test; point RANGEGUARD_API elsewhere (local backend, staging) to override
+DEFAULT_BASE_URL = os.environ.get("RANGEGUARD_API", "https://cotos-check.preview.emergentagent.com")
+
+# Connections allowed per host; concurrent checks never use more workers than this
+POOL_SIZE = 20
+
+CASSETTE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "cassettes")
+
+def make_client(base_url="", timeout=httpx.Timeout(10, connect=3.05)):
+    """One HTTP/2 client: concurrent requests share a single multiplexed connection"""
+    return httpx.Client(
+        base_url=base_url,
+        headers={'Content-Type': 'application/json'},
+        timeout=timeout,
+        transport=httpx.HTTPTransport(
+            http2=True, retries=1,
+            limits=httpx.Limits(max_keepalive_connections=10, max_connections=POOL_SIZE)
+        )
+    )
+
+def _scrub_response(response):
+    """Blank per-run values (tokens, favorite ids, timestamps) so re-recorded cassettes diff cleanly"""
+    body = response["body"].get("string")
+    try:
+        payload = json.loads(body) if body else None
+    except ValueError:
+        return response
+    if not isinstance(payload, dict):
+        return response
+    if "token" in payload:
+        payload["token"] = "recorded-token"
+    if "id" in payload and "route_id" in payload:
+        payload["id"] = "recorded-favorite-id"
+    if "created_at" in payload:
+        payload["created_at"] = "1970-01-01T00:00:00+00:00"
+    body = json.dumps(payload).encode()
+    response["body"]["string"] = body
+    for header in response["headers"]:
+        if header.lower() == "content-length":
+            response["headers"][header] = [str(len(body))]
+    return response
+
+def cassette(name, enabled=True):
+    """Record HTTP traffic to fixtures/cassettes/<name> on first use and replay it afterwards"""
+    if not enabled:
+        return contextlib.nullcontext()
+    import vcr  # only needed for --cassette runs
+    recorder = vcr.VCR(
+        cassette_library_dir=CASSETTE_DIR,
+        record_mode="new_episodes",
+        match_on=["method", "scheme", "host", "path", "query", "body"],
+        filter_headers=["authorization"],
+        decode_compressed_response=True,
+        before_record_response=_scrub_response,
+    )
+    return recorder.use_cassette(name)
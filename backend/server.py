@@ -1,9 +1,9 @@
-import dns.resolver
 import logging
 
 logger = logging.getLogger(__name__)
 
 #try:
+    #import dns.resolver
     # Resolver muy temprano y con fallback múltiple
     #resolver = dns.resolver.Resolver(configure=False)
     #resolver.nameservers = ['8.8.8.8', '8.8.4.4', '1.1.1.1', '1.0.0.1', '9.9.9.9']  # + Quad9
@@ -16,28 +16,37 @@ logger = logging.getLogger(__name__)
 #    logger.error(f"SRV DNS override failed: {e}")
 
 from fastapi import FastAPI, APIRouter, HTTPException, Depends, UploadFile, File, Form, Query, Header
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse, Response
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from starlette.middleware.gzip import GZipMiddleware
+from pymongo import AsyncMongoClient, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
 import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict, EmailStr
 from typing import List, Optional
-import uuid
+import secrets
 from datetime import datetime, timezone
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 import bcrypt
 import jwt
-from functools import wraps
-import gpxpy
-from shapely.geometry import shape, LineString, Polygon, mapping
-from shapely.ops import unary_union
+import hashlib
 import json
-import io
-import dns.resolver
-from fpdf import FPDF
+import re
+import time
+from cachetools import TTLCache
+import gpxpy
+from shapely.geometry import shape, box, LineString, mapping
+from shapely.ops import transform
+from pyproj import Transformer
+from shapely.strtree import STRtree
+from shapely.prepared import prep
+from collections import OrderedDict
+import numpy as np
+import shapely
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -45,7 +54,8 @@ load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(
+# PyMongo's native asyncio client: no Motor thread-pool hop per operation
+client = AsyncMongoClient(
     mongo_url,
     serverSelectionTimeoutMS=60000,   # 60s para elegir server
     connectTimeoutMS=60000,
@@ -58,12 +68,42 @@ db = client[os.environ['DB_NAME']]
 JWT_SECRET = os.environ.get('JWT_SECRET', 'rangeguard-secret-key-change-in-production')
 JWT_ALGORITHM = "HS256"
 
+# Optional cache shared by all workers; without REDIS_URL every process keeps its own
+REDIS_URL = os.environ.get('REDIS_URL')
+redis_client = None
+
+async def redis_get_json(key: str):
+    """Read a JSON value from Redis. None when Redis is off, the key is missing or Redis fails."""
+    if redis_client is None:
+        return None
+    try:
+        raw = await redis_client.get(key)
+        return json.loads(raw) if raw is not None else None
+    except ValueError as e:
+        # A corrupt or foreign value is a miss; it gets overwritten on the next set
+        logger.warning(f"Ignoring undecodable Redis value under {key}: {e}")
+    except Exception as e:
+        logger.warning(f"Redis get failed: {e}")
+    return None
+
+async def redis_set_json(key: str, value, ttl: float):
+    if redis_client is None:
+        return
+    try:
+        await redis_client.set(key, json.dumps(value), ex=max(1, int(ttl)))
+    except Exception as e:
+        logger.warning(f"Redis set failed: {e}")
+
 app = FastAPI()
 api_router = APIRouter(prefix="/api")
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+def new_id() -> str:
+    """Random 128-bit document id as 32 hex chars."""
+    return secrets.token_hex(16)
+
 # ==================== MODELS ====================
 
 class UserRegister(BaseModel):
@@ -128,6 +168,15 @@ class IntersectionRequest(BaseModel):
     route_geometry: Optional[dict] = None
     check_time: Optional[str] = None
 
+class BatchIntersectionRequest(BaseModel):
+    routes: List[dict]  # GeoJSON route geometries, checked independently
+    check_time: Optional[str] = None
+
+class FavoritesBatch(BaseModel):
+    add: List[str] = []
+    remove: List[str] = []
+    include_state: bool = False
+
 class IntersectionResult(BaseModel):
     intersects: bool
     zones: List[dict] = []
@@ -135,11 +184,22 @@ class IntersectionResult(BaseModel):
 
 # ==================== AUTH HELPERS ====================
 
-def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+# bcrypt is deliberately slow; run it on its own pool so it never blocks the event loop
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', 12))
+_bcrypt_executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 4, thread_name_prefix="bcrypt")
+
+async def hash_password(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    hashed = await loop.run_in_executor(
+        _bcrypt_executor, bcrypt.hashpw, password.encode('utf-8'), bcrypt.gensalt(BCRYPT_ROUNDS)
+    )
+    return hashed.decode('utf-8')
 
-def verify_password(password: str, hashed: str) -> bool:
-    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+async def verify_password(password: str, hashed: str) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _bcrypt_executor, bcrypt.checkpw, password.encode('utf-8'), hashed.encode('utf-8')
+    )
 
 def create_token(user_id: str, role: str) -> str:
     payload = {
@@ -149,13 +209,52 @@ def create_token(user_id: str, role: str) -> str:
     }
     return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
 
+# Verified token -> (user, exp), keyed by a hash of the token so raw tokens are never held
+AUTH_CACHE_TTL = 60
+_auth_cache = TTLCache(maxsize=10_000, ttl=AUTH_CACHE_TTL)
+_auth_pending = {}
+
+async def _load_token_user(token: str, key: bytes):
+    # Another worker may already have verified this token
+    redis_key = f"auth:{key.hex()}"
+    shared = await redis_get_json(redis_key)
+    if shared is not None and shared["exp"] > time.time():
+        _auth_cache[key] = (shared["user"], shared["exp"])
+        return shared["user"]
+    payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+    user = await db.users.find_one({"id": payload["user_id"]}, {"_id": 0, "password_hash": 0})
+    if user:
+        _auth_cache[key] = (user, payload["exp"])
+        await redis_set_json(
+            redis_key, {"user": user, "exp": payload["exp"]},
+            min(AUTH_CACHE_TTL, payload["exp"] - time.time())
+        )
+    return user
+
+async def get_token_user(token: str):
+    """Verify a JWT and return its user (or None), skipping HMAC + lookup on cache hits.
+    Raises jwt.InvalidTokenError subclasses like jwt.decode."""
+    key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    cached = _auth_cache.get(key)
+    if cached is not None:
+        user, exp = cached
+        if exp > time.time():
+            return user
+        _auth_cache.pop(key, None)
+    # Concurrent misses for the same token share a single verification
+    task = _auth_pending.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_load_token_user(token, key))
+        _auth_pending[key] = task
+        task.add_done_callback(lambda _: _auth_pending.pop(key, None))
+    return await asyncio.shield(task)
+
 async def get_current_user(authorization: Optional[str] = Header(None)):
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Not authenticated")
     token = authorization.split(" ")[1]
     try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        user = await db.users.find_one({"id": payload["user_id"]}, {"_id": 0})
+        user = await get_token_user(token)
         if not user:
             raise HTTPException(status_code=401, detail="User not found")
         return user
@@ -169,9 +268,7 @@ async def get_optional_user(authorization: Optional[str] = Header(None)):
         return None
     try:
         token = authorization.split(" ")[1]
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        user = await db.users.find_one({"id": payload["user_id"]}, {"_id": 0})
-        return user
+        return await get_token_user(token)
     except Exception:
         return None
 
@@ -183,11 +280,11 @@ async def register(data: UserRegister):
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    user_id = str(uuid.uuid4())
+    user_id = new_id()
     user_doc = {
         "id": user_id,
         "email": data.email,
-        "password_hash": hash_password(data.password),
+        "password_hash": await hash_password(data.password),
         "name": data.name,
         "role": data.role,
         "organization_name": data.organization_name or "",
@@ -211,7 +308,7 @@ async def register(data: UserRegister):
 @api_router.post("/auth/login")
 async def login(data: UserLogin):
     user = await db.users.find_one({"email": data.email}, {"_id": 0})
-    if not user or not verify_password(data.password, user["password_hash"]):
+    if not user or not await verify_password(data.password, user["password_hash"]):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
     token = create_token(user["id"], user["role"])
@@ -240,72 +337,112 @@ async def get_me(user = Depends(get_current_user)):
 
 # ==================== ZONE ROUTES ====================
 
+# (to_metric, to_wgs84) transform functions per projected CRS; building them is the costly part
+_metric_transformers = {}
+
+def metric_crs_for(lon: float, lat: float) -> str:
+    """UTM zone containing the point, or Web Mercator near the poles where UTM is undefined."""
+    if -80 <= lat <= 84:
+        utm_zone = int((lon + 180) // 6) % 60 + 1
+        return f"EPSG:{(32600 if lat >= 0 else 32700) + utm_zone}"
+    return "EPSG:3857"
+
+def get_metric_transformers(crs: str):
+    cached = _metric_transformers.get(crs)
+    if cached is None:
+        to_metric = Transformer.from_crs("EPSG:4326", crs, always_xy=True).transform
+        to_wgs84 = Transformer.from_crs(crs, "EPSG:4326", always_xy=True).transform
+        cached = _metric_transformers[crs] = (to_metric, to_wgs84)
+    return cached
+
 def compute_buffer(geometry: dict, buffer_meters: int) -> dict:
-    """Compute buffer around a polygon in approximate meters."""
+    """Compute buffer around a polygon in meters, in the local UTM projection.
+    Returns the buffered geometry plus the bounding boxes stored on the zone doc."""
     try:
         geom = shape(geometry)
-        # Approximate: 1 degree ~ 111320 meters at equator
-        buffer_deg = buffer_meters / 111320.0
-        buffered = geom.buffer(buffer_deg)
-        return mapping(buffered)
+        centroid = geom.centroid
+        to_metric, to_wgs84 = get_metric_transformers(metric_crs_for(centroid.x, centroid.y))
+        buffered = transform(to_wgs84, transform(to_metric, geom).buffer(buffer_meters))
+        return {
+            "buffered_geometry": mapping(buffered),
+            "bbox": list(geom.bounds),
+            "buffered_bbox": list(buffered.bounds)
+        }
     except Exception as e:
         logger.error(f"Buffer computation error: {e}")
-        return geometry
+        return {"buffered_geometry": geometry, "bbox": None, "buffered_bbox": None}
+
+# start_at/end_at mirror start_time/end_time as BSON dates for range queries;
+# the API keeps exposing the ISO strings
+ZONE_PROJECTION = {"_id": 0, "start_at": 0, "end_at": 0}
+
+def parse_time(value: str) -> datetime:
+    """Parse an ISO-8601 string to an aware UTC datetime (naive values are taken as UTC)."""
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+def parse_zone_times(start_time: str, end_time: str):
+    try:
+        return parse_time(start_time), parse_time(end_time)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="start_time and end_time must be ISO datetimes")
 
 @api_router.post("/zones")
 async def create_zone(data: ZoneCreate, user = Depends(get_current_user)):
     if user["role"] != "admin":
         raise HTTPException(status_code=403, detail="Only admins can create zones")
     
-    zone_id = str(uuid.uuid4())
-    buffered_geom = compute_buffer(data.geometry, data.buffer_meters)
+    start_at, end_at = parse_zone_times(data.start_time, data.end_time)
+    zone_id = new_id()
+    buffer_fields = compute_buffer(data.geometry, data.buffer_meters)
     
     zone_doc = {
         "id": zone_id,
         "name": data.name,
         "description": data.description or "",
         "geometry": data.geometry,
-        "buffered_geometry": buffered_geom,
+        **buffer_fields,
         "start_time": data.start_time,
         "end_time": data.end_time,
+        "start_at": start_at,
+        "end_at": end_at,
         "buffer_meters": data.buffer_meters,
         "created_by": user["id"],
         "association_name": user.get("organization_name", user["name"]),
         "created_at": datetime.now(timezone.utc).isoformat()
     }
+    zone_doc["updated_at"] = zone_doc["created_at"]
     await db.zones.insert_one(zone_doc)
+    await invalidate_zone_caches(zone_id)
     
     zone_doc.pop("_id", None)
     
     # Background: check existing routes against this new zone and notify users
     asyncio.create_task(check_routes_against_new_zone(zone_doc))
     
-    return zone_doc
+    return {k: v for k, v in zone_doc.items() if k not in ZONE_PROJECTION}
 
 @api_router.get("/zones")
 async def get_zones(
     active: Optional[bool] = None,
     date: Optional[str] = None
 ):
-    query = {}
     if active or date:
-        check_time = date if date else datetime.now(timezone.utc).isoformat()
-        query = {
-            "start_time": {"$lte": check_time},
-            "end_time": {"$gte": check_time}
-        }
+        return await get_active_zones(date)
     
-    zones = await db.zones.find(query, {"_id": 0}).to_list(1000)
+    zones = await db.zones.find({}, ZONE_PROJECTION).to_list(1000)
     return zones
 
 @api_router.get("/zones/my/list")
 async def get_my_zones(user = Depends(get_current_user)):
-    zones = await db.zones.find({"created_by": user["id"]}, {"_id": 0}).to_list(1000)
+    zones = await db.zones.find({"created_by": user["id"]}, ZONE_PROJECTION).to_list(1000)
     return zones
 
 @api_router.get("/zones/{zone_id}")
 async def get_zone(zone_id: str):
-    zone = await db.zones.find_one({"id": zone_id}, {"_id": 0})
+    zone = await db.zones.find_one({"id": zone_id}, ZONE_PROJECTION)
     if not zone:
         raise HTTPException(status_code=404, detail="Zone not found")
     return zone
@@ -315,7 +452,7 @@ async def update_zone(zone_id: str, data: ZoneUpdate, user = Depends(get_current
     if user["role"] != "admin":
         raise HTTPException(status_code=403, detail="Only admins can update zones")
     
-    zone = await db.zones.find_one({"id": zone_id}, {"_id": 0})
+    zone = await db.zones.find_one({"id": zone_id}, ZONE_PROJECTION)
     if not zone:
         raise HTTPException(status_code=404, detail="Zone not found")
     if zone["created_by"] != user["id"]:
@@ -325,14 +462,27 @@ async def update_zone(zone_id: str, data: ZoneUpdate, user = Depends(get_current
     
     if "geometry" in update_data:
         buffer_m = update_data.get("buffer_meters", zone["buffer_meters"])
-        update_data["buffered_geometry"] = compute_buffer(update_data["geometry"], buffer_m)
+        update_data.update(compute_buffer(update_data["geometry"], buffer_m))
     elif "buffer_meters" in update_data:
-        update_data["buffered_geometry"] = compute_buffer(zone["geometry"], update_data["buffer_meters"])
+        update_data.update(compute_buffer(zone["geometry"], update_data["buffer_meters"]))
+    
+    if not update_data:
+        return zone
     
-    if update_data:
-        await db.zones.update_one({"id": zone_id}, {"$set": update_data})
+    if "start_time" in update_data or "end_time" in update_data:
+        update_data["start_at"], update_data["end_at"] = parse_zone_times(
+            update_data.get("start_time", zone["start_time"]),
+            update_data.get("end_time", zone["end_time"])
+        )
     
-    updated = await db.zones.find_one({"id": zone_id}, {"_id": 0})
+    update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
+    updated = await db.zones.find_one_and_update(
+        {"id": zone_id},
+        {"$set": update_data},
+        projection=ZONE_PROJECTION,
+        return_document=ReturnDocument.AFTER
+    )
+    await invalidate_zone_caches(zone_id)
     return updated
 
 @api_router.delete("/zones/{zone_id}")
@@ -347,10 +497,25 @@ async def delete_zone(zone_id: str, user = Depends(get_current_user)):
         raise HTTPException(status_code=403, detail="You can only delete your own zones")
     
     await db.zones.delete_one({"id": zone_id})
+    await invalidate_zone_caches(zone_id)
     return {"message": "Zone deleted"}
 
 # ==================== ROUTE ROUTES ====================
 
+def name_words(name: str) -> list:
+    """Lowercased words of a route name, stored for indexed prefix search."""
+    return re.findall(r"\w+", name.lower())
+
+# Degrees (~1 m at the equator); must stay well below the smallest zone buffer
+ROUTE_SIMPLIFY_TOLERANCE = 1e-5
+
+# Server-side fields of route documents (intersection copy, search words, bbox prefilter);
+# never sent to clients
+ROUTE_INTERNAL_FIELDS = ("simplified_geometry", "name_words", "bbox")
+ROUTE_PROJECTION = {"_id": 0, **{field: 0 for field in ROUTE_INTERNAL_FIELDS}}
+MAX_GPX_BYTES = int(os.environ.get('MAX_GPX_MB', 20)) * 1024 * 1024
+GPX_TOO_LARGE = f"GPX file exceeds the {MAX_GPX_BYTES // (1024 * 1024)} MB limit"
+
 @api_router.post("/routes/upload")
 async def upload_route(
     file: UploadFile = File(...),
@@ -359,49 +524,53 @@ async def upload_route(
 ):
     user = await get_optional_user(authorization)
     
-    content = await file.read()
-    content_str = content.decode('utf-8')
+    # Requests announcing a size are rejected by reject_oversized_uploads; this catches chunked ones
+    if file.size is not None and file.size > MAX_GPX_BYTES:
+        raise HTTPException(status_code=413, detail=GPX_TOO_LARGE)
     
-    # Parse GPX
+    # Parse GPX straight from the spooled upload (no extra bytes + str copies)
     try:
-        gpx = gpxpy.parse(content_str)
+        gpx = gpxpy.parse(file.file)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Invalid GPX file: {str(e)}")
     
     # Extract coordinates
-    coordinates = []
-    for track in gpx.tracks:
-        for segment in track.segments:
-            for point in segment.points:
-                coordinates.append([point.longitude, point.latitude])
-    
-    if not coordinates or len(coordinates) < 2:
+    points = [(p.longitude, p.latitude) for t in gpx.tracks for seg in t.segments for p in seg.points]
+    if len(points) < 2:
         # Try waypoints
-        for wpt in gpx.waypoints:
-            coordinates.append([wpt.longitude, wpt.latitude])
+        points += [(w.longitude, w.latitude) for w in gpx.waypoints]
     
-    if len(coordinates) < 2:
+    if len(points) < 2:
         raise HTTPException(status_code=400, detail="GPX file has insufficient points")
     
+    coords = np.asarray(points, dtype=np.float64)
+    coordinates = coords.tolist()
     geometry = {
         "type": "LineString",
         "coordinates": coordinates
     }
     
+    # Dense tracks get a simplified copy for intersection predicates
+    simplified = LineString(coords).simplify(ROUTE_SIMPLIFY_TOLERANCE, preserve_topology=False)
+    
     route_name = name or gpx.name or file.filename or "Unnamed Route"
-    route_id = str(uuid.uuid4())
+    route_id = new_id()
     user_id = user["id"] if user else "anonymous"
     
     route_doc = {
         "id": route_id,
         "name": route_name,
+        "name_words": name_words(route_name),
         "geometry": geometry,
+        "bbox": [*coords.min(axis=0).tolist(), *coords.max(axis=0).tolist()],
         "user_id": user_id,
         "file_name": file.filename,
         "is_public": True,
         "owner_name": user["name"] if user else "Anonymous",
         "created_at": datetime.now(timezone.utc).isoformat()
     }
+    if len(simplified.coords) < len(coordinates):
+        route_doc["simplified_geometry"] = mapping(simplified)
     await db.routes.insert_one(route_doc)
     route_doc.pop("_id", None)
     
@@ -409,24 +578,35 @@ async def upload_route(
     if user and user_id != "anonymous":
         asyncio.create_task(check_uploaded_route_against_zones(route_doc, user_id))
     
-    return route_doc
+    return {k: v for k, v in route_doc.items() if k not in ROUTE_INTERNAL_FIELDS}
 
 @api_router.get("/routes")
 async def get_routes(user = Depends(get_current_user)):
-    routes = await db.routes.find({"user_id": user["id"]}, {"_id": 0}).to_list(1000)
+    routes = await db.routes.find({"user_id": user["id"]}, ROUTE_PROJECTION).to_list(1000)
     return routes
 
 @api_router.get("/routes/public")
 async def get_public_routes(search: Optional[str] = None):
     """Get all public routes for browsing."""
     query = {"is_public": {"$ne": False}}
-    if search:
-        query["name"] = {"$regex": search, "$options": "i"}
-    routes = await db.routes.find(query, {"_id": 0}).to_list(500)
-    # Strip geometry coordinates for listing (too much data) - include summary
+    terms = name_words(search or "")
+    if terms:
+        # Every term must prefix a word of the name; anchored regexes use the name_words index
+        query["$and"] = [{"name_words": re.compile("^" + re.escape(t))} for t in terms]
+    # Strip geometry coordinates for listing (too much data) - Mongo computes the point count.
+    # Clients load the full geometry from /routes/{route_id} when a route is selected.
+    cursor = await db.routes.aggregate([
+        {"$match": query},
+        {"$limit": 500},
+        {"$project": {
+            "_id": 0, "id": 1, "name": 1, "user_id": 1, "owner_name": 1,
+            "file_name": 1, "is_public": 1, "created_at": 1,
+            "point_count": {"$size": {"$ifNull": ["$geometry.coordinates", []]}}
+        }}
+    ])
+    routes = await cursor.to_list(500)
     result = []
     for r in routes:
-        coords = r.get("geometry", {}).get("coordinates", [])
         result.append({
             "id": r["id"],
             "name": r["name"],
@@ -434,16 +614,15 @@ async def get_public_routes(search: Optional[str] = None):
             "owner_name": r.get("owner_name", "Unknown"),
             "file_name": r.get("file_name", ""),
             "is_public": r.get("is_public", True),
-            "point_count": len(coords),
-            "created_at": r["created_at"],
-            "geometry": r["geometry"]
+            "point_count": r["point_count"],
+            "created_at": r["created_at"]
         })
     return result
 
 @api_router.get("/routes/{route_id}")
 async def get_route_detail(route_id: str):
     """Get a single route with full geometry."""
-    route = await db.routes.find_one({"id": route_id}, {"_id": 0})
+    route = await db.routes.find_one({"id": route_id}, ROUTE_PROJECTION)
     if not route:
         raise HTTPException(status_code=404, detail="Route not found")
     return route
@@ -451,17 +630,75 @@ async def get_route_detail(route_id: str):
 @api_router.put("/routes/{route_id}/visibility")
 async def toggle_route_visibility(route_id: str, user = Depends(get_current_user)):
     """Toggle a route's public/private status."""
-    route = await db.routes.find_one({"id": route_id}, {"_id": 0})
-    if not route:
+    # Flip the flag in one round-trip; only fall back to a lookup to pick the error
+    updated = await db.routes.find_one_and_update(
+        {"id": route_id, "user_id": user["id"]},
+        [{"$set": {"is_public": {"$not": [{"$ifNull": ["$is_public", True]}]}}}],
+        projection={"_id": 0, "is_public": 1},
+        return_document=ReturnDocument.AFTER
+    )
+    if updated is None:
+        if await db.routes.find_one({"id": route_id}, {"_id": 1}):
+            raise HTTPException(status_code=403, detail="Not your route")
         raise HTTPException(status_code=404, detail="Route not found")
-    if route["user_id"] != user["id"]:
-        raise HTTPException(status_code=403, detail="Not your route")
-    new_vis = not route.get("is_public", True)
-    await db.routes.update_one({"id": route_id}, {"$set": {"is_public": new_vis}})
-    return {"is_public": new_vis}
+    return {"is_public": updated["is_public"]}
 
 # ==================== FAVORITES ====================
 
+MAX_BATCH_FAVORITES = 100
+
+# Registered before /favorites/{route_id} so "batch" is not taken for a route id
+@api_router.post("/favorites/batch")
+async def batch_favorites(data: FavoritesBatch, user = Depends(get_current_user)):
+    """Add and remove several favorites in one call, optionally returning the resulting state.
+    Unknown routes and routes already in the requested state are skipped rather than rejected."""
+    if len(data.add) > MAX_BATCH_FAVORITES or len(data.remove) > MAX_BATCH_FAVORITES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_FAVORITES} routes to add or remove per batch")
+    
+    added, removed = [], []
+    if data.add:
+        routes = await db.routes.find(
+            {"id": {"$in": data.add}}, {"_id": 0, "id": 1, "name": 1, "owner_name": 1}
+        ).to_list(len(data.add))
+        existing = await db.favorites.find(
+            {"user_id": user["id"], "route_id": {"$in": data.add}}, {"_id": 0, "route_id": 1}
+        ).to_list(len(data.add))
+        already = {f["route_id"] for f in existing}
+        now = datetime.now(timezone.utc).isoformat()
+        fav_docs = [{
+            "id": new_id(),
+            "user_id": user["id"],
+            "route_id": route["id"],
+            "route_name": route["name"],
+            "owner_name": route.get("owner_name", "Unknown"),
+            "created_at": now
+        } for route in routes if route["id"] not in already]
+        skipped = set()
+        if fav_docs:
+            try:
+                await db.favorites.insert_many(fav_docs, ordered=False)
+            except BulkWriteError as e:
+                # A concurrent request favorited some of these first: they are already favorites
+                errors = e.details.get("writeErrors", [])
+                if any(err.get("code") != 11000 for err in errors):
+                    raise
+                skipped = {err["index"] for err in errors}
+        added = [f["route_id"] for i, f in enumerate(fav_docs) if i not in skipped]
+    
+    if data.remove:
+        existing = await db.favorites.find(
+            {"user_id": user["id"], "route_id": {"$in": data.remove}}, {"_id": 0, "route_id": 1}
+        ).to_list(len(data.remove))
+        removed = [f["route_id"] for f in existing]
+        if removed:
+            await db.favorites.delete_many({"user_id": user["id"], "route_id": {"$in": removed}})
+    
+    result = {"added": added, "removed": removed}
+    if data.include_state:
+        favorites = await load_favorites(user["id"])
+        result["state"] = {"ids": [f["route_id"] for f in favorites], "favorites": favorites}
+    return result
+
 @api_router.post("/favorites/{route_id}")
 async def add_favorite(route_id: str, user = Depends(get_current_user)):
     """Add a route to user's favorites."""
@@ -474,7 +711,7 @@ async def add_favorite(route_id: str, user = Depends(get_current_user)):
         raise HTTPException(status_code=400, detail="Already in favorites")
     
     fav_doc = {
-        "id": str(uuid.uuid4()),
+        "id": new_id(),
         "user_id": user["id"],
         "route_id": route_id,
         "route_name": route["name"],
@@ -493,12 +730,11 @@ async def remove_favorite(route_id: str, user = Depends(get_current_user)):
         raise HTTPException(status_code=404, detail="Not in favorites")
     return {"message": "Removed from favorites"}
 
-@api_router.get("/favorites")
-async def get_favorites(user = Depends(get_current_user)):
-    """Get user's favorite routes with full route data."""
-    favs = await db.favorites.find({"user_id": user["id"]}, {"_id": 0}).to_list(500)
+async def load_favorites(user_id: str):
+    """User's favorites joined with their route data (missing routes are skipped)."""
+    favs = await db.favorites.find({"user_id": user_id}, {"_id": 0}).to_list(500)
     route_ids = [f["route_id"] for f in favs]
-    routes = await db.routes.find({"id": {"$in": route_ids}}, {"_id": 0}).to_list(500)
+    routes = await db.routes.find({"id": {"$in": route_ids}}, ROUTE_PROJECTION).to_list(500)
     routes_map = {r["id"]: r for r in routes}
     
     result = []
@@ -511,12 +747,17 @@ async def get_favorites(user = Depends(get_current_user)):
                 "route_name": route["name"],
                 "owner_name": route.get("owner_name", "Unknown"),
                 "geometry": route["geometry"],
-                "is_own": route["user_id"] == user["id"],
+                "is_own": route["user_id"] == user_id,
                 "favorited_at": fav["created_at"],
                 "route_created_at": route["created_at"]
             })
     return result
 
+@api_router.get("/favorites")
+async def get_favorites(user = Depends(get_current_user)):
+    """Get user's favorite routes with full route data."""
+    return await load_favorites(user["id"])
+
 @api_router.get("/favorites/ids")
 async def get_favorite_ids(user = Depends(get_current_user)):
     """Get just the route IDs the user has favorited (for quick UI checks)."""
@@ -531,79 +772,296 @@ async def delete_route(route_id: str, user = Depends(get_current_user)):
     if route["user_id"] != user["id"]:
         raise HTTPException(status_code=403, detail="Not your route")
     await db.routes.delete_one({"id": route_id})
+    _route_shapes.pop((route_id, "full"), None)
+    _route_shapes.pop((route_id, "simplified"), None)
     return {"message": "Route deleted"}
 
 # ==================== INTERSECTION CHECK ====================
 
-def check_route_against_zones(route_shape, active_zones):
-    """Check a route against active zones. Returns list of conflicts."""
+# Pool for CPU-bound shapely work in background scans (GEOS releases the GIL)
+GEOMETRY_WORKERS = os.cpu_count() or 4
+_geometry_executor = ThreadPoolExecutor(max_workers=GEOMETRY_WORKERS, thread_name_prefix="geometry")
+
+# STRtree over the buffered bounding boxes of the last zone set checked. Keyed by
+# the zones version and each zone's updated_at, so writes made here or in another
+# worker make the cached tree unreachable.
+_zones_version = 0
+_zone_index = {}
+
+# Zones active at a given time, shared across requests for a short window
+ACTIVE_ZONES_TTL = 2
+_active_zones_cache = TTLCache(maxsize=64, ttl=ACTIVE_ZONES_TTL)
+
+# Zone conflicts per (zones generation, kind, route, check time). "Now" checks share a
+# one-minute bucket, so a zone starting or ending shows up within a minute. The generation
+# is shared through Redis so zone writes in any worker retire cached results everywhere.
+ZONES_GENERATION_KEY = "zones:generation"
+ISECT_CACHE_TTL = 300
+ISECT_NOW_BUCKET = 60
+_isect_cache = TTLCache(maxsize=4096, ttl=ISECT_CACHE_TTL)
+
+# Parsed and prepared shapes per zone, keyed by (zone id, updated_at) with LRU eviction
+ZONE_SHAPES_CACHE_SIZE = 4096
+_zone_shapes = OrderedDict()
+
+# Parsed shapes of stored routes, keyed by (route id, "full" | "simplified"). Route
+# geometry never changes after upload, so only deletion has to evict.
+ROUTE_SHAPES_CACHE_SIZE = 256
+_route_shapes = OrderedDict()
+
+async def invalidate_zone_caches(zone_id: str):
+    """Drop cached geometry for a zone after it is created, updated or deleted."""
+    global _zones_version
+    _zones_version += 1
+    _zone_index.clear()
+    _active_zones_cache.clear()
+    _isect_cache.clear()
+    for key in [k for k in _zone_shapes if k[0] == zone_id]:
+        del _zone_shapes[key]
+    if redis_client is not None:
+        try:
+            await redis_client.incr(ZONES_GENERATION_KEY)
+            async for key in redis_client.scan_iter(match="zones:active:*"):
+                await redis_client.delete(key)
+        except Exception as e:
+            logger.warning(f"Redis zone invalidation failed: {e}")
+
+async def zones_generation():
+    """Cache key component for zone-derived results, bumped on every zone write.
+    Without Redis, writes in other workers are invisible here, so results are only
+    reused within one ACTIVE_ZONES_TTL window, like the active zone set itself."""
+    if redis_client is not None:
+        try:
+            return ("shared", int(await redis_client.get(ZONES_GENERATION_KEY) or 0))
+        except Exception as e:
+            logger.warning(f"Redis zones generation read failed: {e}")
+    return (_zones_version, int(time.time() // ACTIVE_ZONES_TTL))
+
+async def get_active_zones(check_time: Optional[str] = None):
+    """Zones active at check_time (default: now). Memoized for ACTIVE_ZONES_TTL seconds;
+    "now" lookups share one entry per TTL window."""
+    if check_time is None:
+        key = (_zones_version, None, int(time.time() // ACTIVE_ZONES_TTL))
+        redis_key = f"zones:active:now:{key[2]}"
+    else:
+        key = (_zones_version, check_time)
+        redis_key = f"zones:active:{check_time}"
+    zones = _active_zones_cache.get(key)
+    if zones is None:
+        zones = await redis_get_json(redis_key)
+        if zones is not None:
+            _active_zones_cache[key] = zones
+            return zones
+        try:
+            at = parse_time(check_time) if check_time else datetime.now(timezone.utc)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid check time")
+        zones = await db.zones.find({
+            "start_at": {"$lte": at},
+            "end_at": {"$gte": at}
+        }, ZONE_PROJECTION).to_list(1000)
+        _active_zones_cache[key] = zones
+        await redis_set_json(redis_key, zones, ACTIVE_ZONES_TTL)
+    return zones
+
+# What the PDF report and upload check read from a zone (shape cache key included)
+ZONE_CHECK_FIELDS = {
+    "_id": 0, "id": 1, "name": 1, "association_name": 1, "start_time": 1, "end_time": 1,
+    "geometry": 1, "buffered_geometry": 1, "buffered_bbox": 1, "created_at": 1, "updated_at": 1
+}
+
+async def find_zones_touching(route_geom_data: dict, time_query: dict):
+    """Zones matching time_query whose buffered geometry the route touches (2dsphere index).
+    Geometries Mongo rejects (e.g. degenerate lines) fall back to the time query alone."""
+    try:
+        return await db.zones.find({
+            **time_query,
+            "buffered_geometry": {"$geoIntersects": {"$geometry": route_geom_data}}
+        }, ZONE_CHECK_FIELDS).to_list(None)
+    except Exception as e:
+        logger.warning(f"Geo query failed, falling back to time window: {e}")
+        return await db.zones.find(time_query, ZONE_CHECK_FIELDS).to_list(5000)
+
+def get_route_shape(route_id: str, geometry: dict, variant: str = "full"):
+    """Return the shapely geometry of a stored route, parsing its GeoJSON once."""
+    key = (route_id, variant)
+    cached = _route_shapes.get(key)
+    if cached is not None:
+        _route_shapes.move_to_end(key)
+        return cached
+    route_shape = shape(geometry)
+    _route_shapes[key] = route_shape
+    if len(_route_shapes) > ROUTE_SHAPES_CACHE_SIZE:
+        _route_shapes.popitem(last=False)
+    return route_shape
+
+def get_zone_shapes(zone):
+    """Return (shape, prepared_shape, buffered_shape, prepared_buffered) for a zone doc."""
+    key = (zone["id"], zone.get("updated_at", zone.get("created_at")))
+    cached = _zone_shapes.get(key)
+    if cached is not None:
+        _zone_shapes.move_to_end(key)
+        return cached
+    original = shape(zone["geometry"])
+    buffered = shape(zone["buffered_geometry"]) if zone.get("buffered_geometry") else original
+    cached = (original, prep(original), buffered, prep(buffered))
+    _zone_shapes[key] = cached
+    if len(_zone_shapes) > ZONE_SHAPES_CACHE_SIZE:
+        _zone_shapes.popitem(last=False)
+    return cached
+
+def geometry_key(geometry: dict) -> bytes:
+    """Stable digest of a GeoJSON geometry for cache keys."""
+    return hashlib.blake2b(json.dumps(geometry, sort_keys=True, separators=(",", ":")).encode(), digest_size=16).digest()
+
+def build_zone_index(zones):
+    """Return (tree, zone_docs): an STRtree over the zones' buffered bounding boxes.
+    Zones with a stored buffered_bbox are indexed without parsing their GeoJSON."""
+    zone_docs, zone_boxes = [], []
+    for zone in zones:
+        try:
+            bbox = zone.get("buffered_bbox")
+            zone_boxes.append(box(*bbox) if bbox else get_zone_shapes(zone)[2].envelope)
+            zone_docs.append(zone)
+        except Exception as e:
+            logger.error(f"Invalid geometry for zone {zone.get('id')}: {e}")
+    return STRtree(zone_boxes), zone_docs
+
+def find_zone_overlaps(route_shape, zones):
+    """Return (zone, contained, overlap_pct) for each zone whose buffered shape the route touches.
+    Candidates come from an STRtree over the zone boxes; predicates and overlap lengths then run
+    as single vectorized GEOS calls over the cached (prepared) shapes. Contained routes are 100%
+    by construction, so the intersection is only computed for partial overlaps."""
+    tree, zone_docs = build_zone_index(zones)
+    candidates, originals, buffered = [], [], []
+    for idx in sorted(tree.query(route_shape)):
+        try:
+            original, _, zone_shape, _ = get_zone_shapes(zone_docs[idx])
+        except Exception as e:
+            logger.error(f"Invalid geometry for zone {zone_docs[idx].get('id')}: {e}")
+            continue
+        candidates.append(zone_docs[idx])
+        originals.append(original)
+        buffered.append(zone_shape)
+    if not candidates:
+        return []
+    
+    originals, buffered = np.array(originals), np.array(buffered)
+    hits = np.flatnonzero(shapely.intersects(buffered, route_shape))
+    contained = shapely.contains(buffered[hits], route_shape)
+    if not contained.all():
+        # The buffer holds the zone, so this only matters for degenerate buffers
+        rest = np.flatnonzero(~contained)
+        contained[rest] = shapely.contains(originals[hits[rest]], route_shape)
+    overlap_pct = np.full(len(hits), 100.0)
+    partial = ~contained
+    if partial.any():
+        lengths = shapely.length(shapely.intersection(route_shape, buffered[hits[partial]]))
+        overlap_pct[partial] = np.minimum(np.round(lengths / (route_shape.length or 1) * 100, 1), 100)
+    return [
+        (candidates[i], bool(c), float(pct))
+        for i, c, pct in zip(hits, contained, overlap_pct)
+    ]
+
+def get_zone_index(zones):
+    """build_zone_index for the shared active zone set, built once per zone set."""
+    key = (_zones_version, tuple((z["id"], z.get("updated_at")) for z in zones))
+    cached = _zone_index.get(key)
+    if cached is None:
+        cached = build_zone_index(zones)
+        _zone_index.clear()
+        _zone_index[key] = cached
+    return cached
+
+def check_route_against_zones(route_shape, active_zones, full_route_geom: dict = None, route_id: str = None):
+    """Check a route against active zones. Returns list of conflicts.
+    route_shape may be simplified; overlap lengths are then measured on full_route_geom
+    (parsed once per stored route when route_id is given)."""
     conflicts = []
-    for zone in active_zones:
+    measure_shape = None
+    tree, zone_docs = get_zone_index(active_zones)
+    # Bounding-box candidates only; the buffered shape contains the original one,
+    # so every contained or intersecting zone is among them.
+    for idx in sorted(tree.query(route_shape)):
+        zone = zone_docs[idx]
         try:
             # Check against both original and buffered geometry
-            zone_geom = zone.get("buffered_geometry", zone["geometry"])
-            zone_shape = shape(zone_geom)
-            original_zone_shape = shape(zone["geometry"])
+            _, original_prep, zone_shape, zone_prep = get_zone_shapes(zone)
             
-            # Check containment first (route fully inside zone)
-            is_contained = original_zone_shape.contains(route_shape) or zone_shape.contains(route_shape)
-            is_intersecting = route_shape.intersects(zone_shape)
-            is_within_buffer = (not original_zone_shape.intersects(route_shape)) and zone_shape.intersects(route_shape)
+            # Containment first (route fully inside the zone or its buffer); the
+            # intersects predicates only run for routes that are not contained
+            if original_prep.contains(route_shape) or zone_prep.contains(route_shape):
+                conflict_type, overlap_pct = "contained", 100.0
+            elif zone_prep.intersects(route_shape):
+                # Touching the buffer but not the zone itself is a buffer-only conflict
+                conflict_type = "intersects" if original_prep.intersects(route_shape) else "buffer"
+                if measure_shape is None:
+                    if not full_route_geom:
+                        measure_shape = route_shape
+                    elif route_id:
+                        measure_shape = get_route_shape(route_id, full_route_geom, "full")
+                    else:
+                        measure_shape = shape(full_route_geom)
+                    route_length = measure_shape.length or 1
+                overlap_length = measure_shape.intersection(zone_shape).length
+                overlap_pct = min(round((overlap_length / route_length) * 100, 1), 100)
+            else:
+                continue
             
-            if is_contained or is_intersecting:
-                if is_contained:
-                    overlap_pct = 100.0
-                    conflict_type = "contained"  # Route fully inside zone
-                elif is_within_buffer:
-                    intersection = route_shape.intersection(zone_shape)
-                    overlap_length = intersection.length if hasattr(intersection, 'length') else 0
-                    route_length = route_shape.length if route_shape.length > 0 else 1
-                    overlap_pct = min(round((overlap_length / route_length) * 100, 1), 100)
-                    conflict_type = "buffer"  # Route in buffer zone only
-                else:
-                    intersection = route_shape.intersection(zone_shape)
-                    overlap_length = intersection.length if hasattr(intersection, 'length') else 0
-                    route_length = route_shape.length if route_shape.length > 0 else 1
-                    overlap_pct = min(round((overlap_length / route_length) * 100, 1), 100)
-                    conflict_type = "intersects"
-                
-                conflicts.append({
-                    "zone_id": zone["id"],
-                    "zone_name": zone["name"],
-                    "association": zone.get("association_name", ""),
-                    "start_time": zone["start_time"],
-                    "end_time": zone["end_time"],
-                    "overlap_percentage": overlap_pct,
-                    "conflict_type": conflict_type,
-                    "buffer_meters": zone.get("buffer_meters", 200),
-                    "geometry": zone["geometry"],
-                    "buffered_geometry": zone.get("buffered_geometry")
-                })
+            conflicts.append({
+                "zone_id": zone["id"],
+                "zone_name": zone["name"],
+                "association": zone.get("association_name", ""),
+                "start_time": zone["start_time"],
+                "end_time": zone["end_time"],
+                "overlap_percentage": overlap_pct,
+                "conflict_type": conflict_type,
+                "buffer_meters": zone.get("buffer_meters", 200),
+                "geometry": zone["geometry"],
+                "buffered_geometry": zone.get("buffered_geometry")
+            })
         except Exception as e:
             logger.error(f"Intersection check error for zone {zone.get('id')}: {e}")
             continue
     return conflicts
 
+def intersection_summary(conflicts):
+    """Wrap zone conflicts in the /check-intersection response shape."""
+    has_contained = any(c["conflict_type"] == "contained" for c in conflicts)
+    has_intersect = any(c["conflict_type"] == "intersects" for c in conflicts)
+    
+    if has_contained:
+        msg = "CRITICAL: Your entire route is inside an active hunting zone!"
+    elif has_intersect:
+        msg = "WARNING: Your route crosses active hunting zones!"
+    elif conflicts:
+        msg = "CAUTION: Your route enters a buffer/safety zone near hunting areas."
+    else:
+        msg = "Safe: No conflicts with active hunting zones."
+    
+    return {
+        "intersects": len(conflicts) > 0,
+        "zones": conflicts,
+        "safe_message": msg
+    }
+
 @api_router.post("/check-intersection")
 async def check_intersection(data: IntersectionRequest):
-    check_time = data.check_time or datetime.now(timezone.utc).isoformat()
-    
-    # Get route geometry
+    # Get route geometry (stored routes may carry a simplified copy for the predicates)
     route_geom_data = data.route_geometry
+    check_geom_data = None
     if data.route_id:
         route = await db.routes.find_one({"id": data.route_id}, {"_id": 0})
         if not route:
             raise HTTPException(status_code=404, detail="Route not found")
         route_geom_data = route["geometry"]
+        check_geom_data = route.get("simplified_geometry")
     
     if not route_geom_data:
         raise HTTPException(status_code=400, detail="No route geometry provided")
     
-    # Get active zones at the given time
-    active_zones = await db.zones.find({
-        "start_time": {"$lte": check_time},
-        "end_time": {"$gte": check_time}
-    }, {"_id": 0}).to_list(1000)
+    # Active zones are shared across requests; the STRtree narrows them to the route
+    active_zones = await get_active_zones(data.check_time)
     
     if not active_zones:
         return {
@@ -613,29 +1071,51 @@ async def check_intersection(data: IntersectionRequest):
         }
     
     try:
-        route_shape = shape(route_geom_data)
+        if data.route_id:
+            route_shape = get_route_shape(
+                data.route_id, check_geom_data or route_geom_data,
+                "simplified" if check_geom_data else "full"
+            )
+        else:
+            route_shape = shape(route_geom_data)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Invalid route geometry: {str(e)}")
     
-    conflicts = check_route_against_zones(route_shape, active_zones)
+    conflicts = check_route_against_zones(
+        route_shape, active_zones, route_geom_data if check_geom_data else None, route_id=data.route_id
+    )
+    return intersection_summary(conflicts)
+
+MAX_BATCH_ROUTES = 50
+
+@api_router.post("/check-intersection/batch")
+async def check_intersection_batch(data: BatchIntersectionRequest):
+    """Check several route geometries against the same active-zone snapshot in one call."""
+    if not data.routes:
+        raise HTTPException(status_code=400, detail="No route geometries provided")
+    if len(data.routes) > MAX_BATCH_ROUTES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_ROUTES} routes per batch")
     
-    has_contained = any(c["conflict_type"] == "contained" for c in conflicts)
-    has_intersect = any(c["conflict_type"] == "intersects" for c in conflicts)
+    shapes = []
+    for i, geom in enumerate(data.routes):
+        try:
+            shapes.append(shape(geom))
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Invalid route geometry at index {i}: {str(e)}")
     
-    if has_contained:
-        msg = "CRITICAL: Your entire route is inside an active hunting zone!"
-    elif has_intersect:
-        msg = "WARNING: Your route crosses active hunting zones!"
-    elif conflicts:
-        msg = "CAUTION: Your route enters a buffer/safety zone near hunting areas."
-    else:
-        msg = "Safe: No conflicts with active hunting zones."
+    active_zones = await get_active_zones(data.check_time)
+    if not active_zones:
+        empty = {
+            "intersects": False,
+            "zones": [],
+            "safe_message": "No active hunting zones at the selected time."
+        }
+        return {"results": [dict(empty) for _ in shapes]}
     
-    return {
-        "intersects": len(conflicts) > 0,
-        "zones": conflicts,
-        "safe_message": msg
-    }
+    return {"results": [
+        intersection_summary(check_route_against_zones(route_shape, active_zones))
+        for route_shape in shapes
+    ]}
 
 # ==================== NOTIFICATIONS ====================
 
@@ -675,10 +1155,10 @@ async def delete_notification(notification_id: str, user = Depends(get_current_u
     await db.notifications.delete_one({"id": notification_id, "user_id": user["id"]})
     return {"message": "Deleted"}
 
-async def create_notification(user_id: str, notif_type: str, title: str, message: str, data: dict = None):
-    """Create a notification for a user."""
-    notif_doc = {
-        "id": str(uuid.uuid4()),
+def build_notification_doc(user_id: str, notif_type: str, title: str, message: str, data: dict = None) -> dict:
+    """Build a notification document without writing it (for batched inserts)."""
+    return {
+        "id": new_id(),
         "user_id": user_id,
         "type": notif_type,  # "zone_conflict", "new_zone", "route_warning"
         "title": title,
@@ -687,196 +1167,274 @@ async def create_notification(user_id: str, notif_type: str, title: str, message
         "read": False,
         "created_at": datetime.now(timezone.utc).isoformat()
     }
-    await db.notifications.insert_one(notif_doc)
-    return notif_doc
+
+def overlaps_against_zone(route_shapes, original_wkb: bytes, buffered_wkb: bytes):
+    """Return (conflict_type, overlap_pct), or None, for each full-resolution route shape
+    against one zone. Runs on the geometry pool. Each batch parses and prepares its own zone
+    copies since prepared geometries are not shared across threads; the predicates and
+    overlap lengths then run as vectorized GEOS calls over the whole batch."""
+    original, buffered = shapely.from_wkb(original_wkb), shapely.from_wkb(buffered_wkb)
+    shapely.prepare(original)
+    shapely.prepare(buffered)
+    routes = np.array(route_shapes)
+    # Candidates were picked on simplified shapes, so the full ones are tested again
+    hits = shapely.intersects(buffered, routes)
+    contained = hits & shapely.contains(buffered, routes)
+    rest = np.flatnonzero(hits & ~contained)
+    if len(rest):
+        # The buffer holds the zone, so this only matters for degenerate buffers
+        contained[rest] = shapely.contains(original, routes[rest])
+    overlap_pct = np.full(len(routes), 100.0)
+    partial = hits & ~contained
+    if partial.any():
+        lengths = shapely.length(shapely.intersection(routes[partial], buffered))
+        route_lengths = shapely.length(routes[partial])
+        route_lengths[route_lengths == 0] = 1
+        overlap_pct[partial] = np.minimum(np.round(lengths / route_lengths * 100, 1), 100)
+    return [
+        ("contained" if c else "intersects", float(pct)) if hit else None
+        for hit, c, pct in zip(hits, contained, overlap_pct)
+    ]
+
+async def get_full_route_shapes(route_ids):
+    """Full-resolution shapes of stored routes by id. Shapes already in the route shape
+    cache are reused; the rest are parsed here without being added to it, so a large scan
+    does not evict the routes being checked interactively."""
+    shapes, missing = {}, []
+    for route_id in route_ids:
+        cached = _route_shapes.get((route_id, "full"))
+        if cached is None:
+            missing.append(route_id)
+        else:
+            shapes[route_id] = cached
+    if missing:
+        async for route in db.routes.find({"id": {"$in": missing}}, {"_id": 0, "id": 1, "geometry": 1}):
+            try:
+                shapes[route["id"]] = shape(route["geometry"])
+            except Exception as e:
+                logger.error(f"Invalid geometry for route {route.get('id')}: {e}")
+    return shapes
 
 async def check_routes_against_new_zone(zone_doc):
     """When a new zone is created, check all existing routes and notify affected users (owners + favorites)."""
     try:
-        zone_shape = shape(zone_doc.get("buffered_geometry", zone_doc["geometry"]))
-        original_zone_shape = shape(zone_doc["geometry"])
-        
-        all_routes = await db.routes.find({}, {"_id": 0}).to_list(5000)
+        # Also warms the shared shape cache for the checks that follow a new zone
+        original_shape, _, zone_shape, _ = get_zone_shapes(zone_doc)
         
-        for route in all_routes:
+        # Only fetch routes whose stored bbox overlaps the buffered zone (or that predate bboxes)
+        route_query = {}
+        zb = zone_doc.get("buffered_bbox")
+        if zb:
+            route_query = {"$or": [
+                {"bbox": {"$exists": False}},
+                {"bbox.0": {"$lte": zb[2]}, "bbox.2": {"$gte": zb[0]},
+                 "bbox.1": {"$lte": zb[3]}, "bbox.3": {"$gte": zb[1]}}
+            ]}
+        # Fetch only the fields used below, preferring the (much smaller) simplified
+        # geometry; full geometry is only loaded for routes stored without one. Routes are
+        # parsed as the cursor yields them and their GeoJSON dropped, so only one batch of
+        # coordinate lists is alive at a time.
+        routes, route_shapes, missing = [], [], {}
+        full_shapes = {}  # routes stored without a simplified copy are parsed at full resolution
+        def add_route(route, geometry, full=False):
             try:
-                route_shape = shape(route["geometry"])
-                is_contained = original_zone_shape.contains(route_shape) or zone_shape.contains(route_shape)
-                is_intersecting = route_shape.intersects(zone_shape)
-                
-                if is_contained or is_intersecting:
-                    if is_contained:
-                        conflict_type = "contained"
-                        overlap_pct = 100.0
-                    else:
-                        conflict_type = "intersects"
-                        intersection = route_shape.intersection(zone_shape)
-                        overlap_length = intersection.length if hasattr(intersection, 'length') else 0
-                        route_length = route_shape.length if route_shape.length > 0 else 1
-                        overlap_pct = min(round((overlap_length / route_length) * 100, 1), 100)
-                    
-                    notif_data = {
-                        "route_id": route["id"],
-                        "route_name": route["name"],
-                        "zone_id": zone_doc["id"],
-                        "zone_name": zone_doc["name"],
-                        "conflict_type": conflict_type,
-                        "zone_start": zone_doc["start_time"],
-                        "zone_end": zone_doc["end_time"]
-                    }
-                    
-                    # Collect all users to notify (owner + favoriters)
-                    users_to_notify = set()
-                    if route["user_id"] != "anonymous":
-                        users_to_notify.add(route["user_id"])
-                    
-                    # Find users who favorited this route
-                    favs = await db.favorites.find({"route_id": route["id"]}, {"_id": 0}).to_list(5000)
-                    for fav in favs:
-                        users_to_notify.add(fav["user_id"])
-                    
-                    for uid in users_to_notify:
-                        is_owner = uid == route["user_id"]
-                        if is_contained:
-                            title = f"CRITICAL: {'Your' if is_owner else 'Favorite'} route '{route['name']}' inside new zone"
-                            message = (
-                                f"{'Your' if is_owner else 'Favorite'} route '{route['name']}' is completely inside "
-                                f"the new hunting zone '{zone_doc['name']}' ({zone_doc.get('association_name', '')}).\n"
-                                f"Active: {zone_doc['start_time'][:16]} - {zone_doc['end_time'][:16]}.\n"
-                                f"Do NOT use this route during hunting hours."
-                            )
-                        else:
-                            title = f"WARNING: {'Your' if is_owner else 'Favorite'} route '{route['name']}' crosses new zone"
-                            message = (
-                                f"{'Your' if is_owner else 'Favorite'} route '{route['name']}' intersects ({overlap_pct}%) "
-                                f"with the new hunting zone '{zone_doc['name']}' ({zone_doc.get('association_name', '')}).\n"
-                                f"Active: {zone_doc['start_time'][:16]} - {zone_doc['end_time'][:16]}.\n"
-                                f"Review this route before heading out."
-                            )
-                        
-                        await create_notification(
-                            user_id=uid,
-                            notif_type="zone_conflict",
-                            title=title,
-                            message=message,
-                            data=notif_data
-                        )
+                route_shapes.append(shape(geometry))
+                routes.append(route)
+                if full:
+                    full_shapes[route["id"]] = route_shapes[-1]
             except Exception as e:
-                logger.error(f"Error checking route {route.get('id')} against new zone: {e}")
-                continue
+                logger.error(f"Invalid geometry for route {route.get('id')}: {e}")
+        
+        async for route in db.routes.find(
+            route_query, {"_id": 0, "id": 1, "name": 1, "user_id": 1, "simplified_geometry": 1}
+        ).limit(5000):
+            geometry = route.pop("simplified_geometry", None)
+            if geometry is None:
+                missing[route["id"]] = route
+            else:
+                add_route(route, geometry)
+        if missing:
+            async for full in db.routes.find(
+                {"id": {"$in": list(missing)}}, {"_id": 0, "id": 1, "geometry": 1}
+            ):
+                add_route(missing[full["id"]], full["geometry"], full=True)
+        
+        # One-shot index over the (mostly simplified) routes picks the candidates touching
+        # the buffered zone; containment and overlap are then measured at full resolution
+        route_tree = STRtree(route_shapes)
+        candidate_routes = [routes[i] for i in sorted(route_tree.query(zone_shape, predicate="intersects"))]
+        del route_shapes, route_tree
+        candidate_ids = {route["id"] for route in candidate_routes}
+        full_shapes = {route_id: full for route_id, full in full_shapes.items() if route_id in candidate_ids}
+        full_shapes.update(await get_full_route_shapes(candidate_ids.difference(full_shapes)))
+        candidate_routes = [route for route in candidate_routes if route["id"] in full_shapes]
+        
+        # Split the geometry work into one batch per pool worker; DB calls stay on the loop.
+        # The workers get the zone as WKB, never the cached (prepared) shapes themselves.
+        zone_wkb = (shapely.to_wkb(original_shape), shapely.to_wkb(zone_shape))
+        loop = asyncio.get_running_loop()
+        batch_size = max(1, -(-len(candidate_routes) // GEOMETRY_WORKERS))
+        batches = [candidate_routes[i:i + batch_size] for i in range(0, len(candidate_routes), batch_size)]
+        batch_results = await asyncio.gather(*(
+            loop.run_in_executor(
+                _geometry_executor, overlaps_against_zone,
+                [full_shapes[route["id"]] for route in batch], *zone_wkb
+            )
+            for batch in batches
+        ))
+        conflicts = [
+            (route, result)
+            for batch, results in zip(batches, batch_results)
+            for route, result in zip(batch, results)
+            if result
+        ]
+        if not conflicts:
+            return
+        
+        # Users who favorited any of the conflicting routes, in a single query
+        favs = await db.favorites.find(
+            {"route_id": {"$in": [route["id"] for route, _ in conflicts]}},
+            {"_id": 0, "route_id": 1, "user_id": 1}
+        ).to_list(None)
+        favoriters = {}
+        for fav in favs:
+            favoriters.setdefault(fav["route_id"], set()).add(fav["user_id"])
+        
+        pending_notifs = []
+        for route, (conflict_type, overlap_pct) in conflicts:
+            is_contained = conflict_type == "contained"
+            notif_data = {
+                "route_id": route["id"],
+                "route_name": route["name"],
+                "zone_id": zone_doc["id"],
+                "zone_name": zone_doc["name"],
+                "conflict_type": conflict_type,
+                "zone_start": zone_doc["start_time"],
+                "zone_end": zone_doc["end_time"]
+            }
+            
+            # Collect all users to notify (owner + favoriters)
+            users_to_notify = set(favoriters.get(route["id"], ()))
+            if route["user_id"] != "anonymous":
+                users_to_notify.add(route["user_id"])
+            
+            for uid in users_to_notify:
+                is_owner = uid == route["user_id"]
+                if is_contained:
+                    title = f"CRITICAL: {'Your' if is_owner else 'Favorite'} route '{route['name']}' inside new zone"
+                    message = (
+                        f"{'Your' if is_owner else 'Favorite'} route '{route['name']}' is completely inside "
+                        f"the new hunting zone '{zone_doc['name']}' ({zone_doc.get('association_name', '')}).\n"
+                        f"Active: {zone_doc['start_time'][:16]} - {zone_doc['end_time'][:16]}.\n"
+                        f"Do NOT use this route during hunting hours."
+                    )
+                else:
+                    title = f"WARNING: {'Your' if is_owner else 'Favorite'} route '{route['name']}' crosses new zone"
+                    message = (
+                        f"{'Your' if is_owner else 'Favorite'} route '{route['name']}' intersects ({overlap_pct}%) "
+                        f"with the new hunting zone '{zone_doc['name']}' ({zone_doc.get('association_name', '')}).\n"
+                        f"Active: {zone_doc['start_time'][:16]} - {zone_doc['end_time'][:16]}.\n"
+                        f"Review this route before heading out."
+                    )
+                
+                pending_notifs.append(build_notification_doc(
+                    user_id=uid,
+                    notif_type="zone_conflict",
+                    title=title,
+                    message=message,
+                    data=notif_data
+                ))
+        
+        if pending_notifs:
+            await db.notifications.insert_many(pending_notifs, ordered=False)
     except Exception as e:
         logger.error(f"Error in check_routes_against_new_zone: {e}")
 
 async def check_uploaded_route_against_zones(route_doc, user_id):
     """When a route is uploaded, check against all zones (current and future) and notify."""
     try:
-        route_shape = shape(route_doc["geometry"])
+        key = (await zones_generation(), "upload", geometry_key(route_doc["geometry"]), int(time.time() // ISECT_NOW_BUCKET))
+        conflicts = _isect_cache.get(key)
+        if conflicts is None:
+            route_shape = get_route_shape(route_doc["id"], route_doc["geometry"])
+            
+            # Zones the route touches, current and future ones
+            all_zones = await find_zones_touching(
+                route_doc.get("simplified_geometry", route_doc["geometry"]),
+                {"end_at": {"$gte": datetime.now(timezone.utc)}}
+            )
+            
+            conflicts = [
+                (zone, "contained" if contained else "intersects", overlap_pct)
+                for zone, contained, overlap_pct in find_zone_overlaps(route_shape, all_zones)
+            ]
+            _isect_cache[key] = conflicts
         
-        # Get all zones (not just active - include future ones)
-        all_zones = await db.zones.find(
-            {"end_time": {"$gte": datetime.now(timezone.utc).isoformat()}},
-            {"_id": 0}
-        ).to_list(5000)
+        pending_notifs = []
+        for zone, conflict_type, overlap_pct in conflicts:
+            if conflict_type == "contained":
+                title = f"CRITICAL: '{route_doc['name']}' is inside hunting zone '{zone['name']}'"
+                message = (
+                    f"Your newly uploaded route '{route_doc['name']}' is completely inside "
+                    f"the hunting zone '{zone['name']}' ({zone.get('association_name', '')}).\n"
+                    f"Active period: {zone['start_time'][:16]} - {zone['end_time'][:16]}.\n"
+                    f"Do NOT use this route during hunting hours."
+                )
+            else:
+                title = f"WARNING: '{route_doc['name']}' crosses hunting zone '{zone['name']}'"
+                message = (
+                    f"Your route '{route_doc['name']}' intersects ({overlap_pct}%) with "
+                    f"the hunting zone '{zone['name']}' ({zone.get('association_name', '')}).\n"
+                    f"Active period: {zone['start_time'][:16]} - {zone['end_time'][:16]}.\n"
+                    f"Avoid this area during hunting hours."
+                )
+            
+            pending_notifs.append(build_notification_doc(
+                user_id=user_id,
+                notif_type="route_warning",
+                title=title,
+                message=message,
+                data={
+                    "route_id": route_doc["id"],
+                    "route_name": route_doc["name"],
+                    "zone_id": zone["id"],
+                    "zone_name": zone["name"],
+                    "conflict_type": conflict_type,
+                    "zone_start": zone["start_time"],
+                    "zone_end": zone["end_time"]
+                }
+            ))
         
-        for zone in all_zones:
-            try:
-                zone_shape = shape(zone.get("buffered_geometry", zone["geometry"]))
-                original_zone_shape = shape(zone["geometry"])
-                
-                is_contained = original_zone_shape.contains(route_shape) or zone_shape.contains(route_shape)
-                is_intersecting = route_shape.intersects(zone_shape)
-                
-                if is_contained or is_intersecting:
-                    if is_contained:
-                        title = f"CRITICAL: '{route_doc['name']}' is inside hunting zone '{zone['name']}'"
-                        message = (
-                            f"Your newly uploaded route '{route_doc['name']}' is completely inside "
-                            f"the hunting zone '{zone['name']}' ({zone.get('association_name', '')}).\n"
-                            f"Active period: {zone['start_time'][:16]} - {zone['end_time'][:16]}.\n"
-                            f"Do NOT use this route during hunting hours."
-                        )
-                        conflict_type = "contained"
-                    else:
-                        intersection = route_shape.intersection(zone_shape)
-                        overlap_length = intersection.length if hasattr(intersection, 'length') else 0
-                        route_length = route_shape.length if route_shape.length > 0 else 1
-                        overlap_pct = min(round((overlap_length / route_length) * 100, 1), 100)
-                        title = f"WARNING: '{route_doc['name']}' crosses hunting zone '{zone['name']}'"
-                        message = (
-                            f"Your route '{route_doc['name']}' intersects ({overlap_pct}%) with "
-                            f"the hunting zone '{zone['name']}' ({zone.get('association_name', '')}).\n"
-                            f"Active period: {zone['start_time'][:16]} - {zone['end_time'][:16]}.\n"
-                            f"Avoid this area during hunting hours."
-                        )
-                        conflict_type = "intersects"
-                    
-                    await create_notification(
-                        user_id=user_id,
-                        notif_type="route_warning",
-                        title=title,
-                        message=message,
-                        data={
-                            "route_id": route_doc["id"],
-                            "route_name": route_doc["name"],
-                            "zone_id": zone["id"],
-                            "zone_name": zone["name"],
-                            "conflict_type": conflict_type,
-                            "zone_start": zone["start_time"],
-                            "zone_end": zone["end_time"]
-                        }
-                    )
-            except Exception as e:
-                logger.error(f"Error checking zone {zone.get('id')} for uploaded route: {e}")
-                continue
+        # One warning per (user, route, zone): repeat checks refresh it instead of piling up
+        if pending_notifs:
+            await db.notifications.bulk_write([
+                UpdateOne(
+                    {
+                        "user_id": doc["user_id"],
+                        "type": doc["type"],
+                        "data.route_id": doc["data"]["route_id"],
+                        "data.zone_id": doc["data"]["zone_id"]
+                    },
+                    {
+                        "$set": {"title": doc["title"], "message": doc["message"], "data": doc["data"]},
+                        "$setOnInsert": {"id": doc["id"], "read": False, "created_at": doc["created_at"]}
+                    },
+                    upsert=True
+                )
+                for doc in pending_notifs
+            ], ordered=False)
     except Exception as e:
         logger.error(f"Error in check_uploaded_route_against_zones: {e}")
 
 # ==================== PDF REPORT ====================
 
-@api_router.post("/reports/pdf")
-async def generate_pdf_report(data: IntersectionRequest):
-    # First run intersection check
-    check_time = data.check_time or datetime.now(timezone.utc).isoformat()
-    
-    route_geom_data = data.route_geometry
-    route_name = "Uploaded Route"
-    if data.route_id:
-        route = await db.routes.find_one({"id": data.route_id}, {"_id": 0})
-        if not route:
-            raise HTTPException(status_code=404, detail="Route not found")
-        route_geom_data = route["geometry"]
-        route_name = route.get("name", "Route")
-    
-    if not route_geom_data:
-        raise HTTPException(status_code=400, detail="No route geometry provided")
-    
-    active_zones = await db.zones.find({
-        "start_time": {"$lte": check_time},
-        "end_time": {"$gte": check_time}
-    }, {"_id": 0}).to_list(1000)
-    
-    route_shape = shape(route_geom_data)
-    intersecting = []
-    for zone in active_zones:
-        try:
-            zone_geom = zone.get("buffered_geometry", zone["geometry"])
-            zone_shape = shape(zone_geom)
-            if route_shape.intersects(zone_shape):
-                intersection = route_shape.intersection(zone_shape)
-                overlap_length = intersection.length if hasattr(intersection, 'length') else 0
-                route_length = route_shape.length if route_shape.length > 0 else 1
-                overlap_pct = min(round((overlap_length / route_length) * 100, 1), 100)
-                intersecting.append({
-                    "name": zone["name"],
-                    "association": zone.get("association_name", ""),
-                    "start": zone["start_time"],
-                    "end": zone["end_time"],
-                    "overlap": f"{overlap_pct}%"
-                })
-        except Exception:
-            continue
-    
-    # Generate PDF
+def pdf_text(value: str, max_len: int = None) -> str:
+    """Truncate and reduce text to latin-1, the only charset fpdf's core fonts can draw."""
+    return value[:max_len].encode("latin-1", "replace").decode("latin-1")
+
+def render_pdf_report(route_name: str, check_time: str, intersecting: list) -> bytes:
+    """Render the safety report. fpdf is only imported here, keeping it out of worker start-up."""
+    from fpdf import FPDF
     pdf = FPDF()
     pdf.add_page()
     pdf.set_font("Helvetica", "B", 20)
@@ -884,7 +1442,7 @@ async def generate_pdf_report(data: IntersectionRequest):
     pdf.ln(5)
     
     pdf.set_font("Helvetica", "", 12)
-    pdf.cell(0, 8, f"Route: {route_name}", ln=True)
+    pdf.cell(0, 8, f"Route: {pdf_text(route_name)}", ln=True)
     pdf.cell(0, 8, f"Check Time: {check_time}", ln=True)
     pdf.cell(0, 8, f"Generated: {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M UTC')}", ln=True)
     pdf.ln(5)
@@ -905,10 +1463,10 @@ async def generate_pdf_report(data: IntersectionRequest):
         
         pdf.set_font("Helvetica", "", 9)
         for z in intersecting:
-            pdf.cell(col_widths[0], 7, z["name"][:25], border=1)
-            pdf.cell(col_widths[1], 7, z["association"][:20], border=1)
-            pdf.cell(col_widths[2], 7, z["start"][:16], border=1)
-            pdf.cell(col_widths[3], 7, z["end"][:16], border=1)
+            pdf.cell(col_widths[0], 7, z["name"], border=1)
+            pdf.cell(col_widths[1], 7, z["association"], border=1)
+            pdf.cell(col_widths[2], 7, z["start"], border=1)
+            pdf.cell(col_widths[3], 7, z["end"], border=1)
             pdf.cell(col_widths[4], 7, z["overlap"], border=1)
             pdf.ln()
     else:
@@ -921,14 +1479,61 @@ async def generate_pdf_report(data: IntersectionRequest):
     pdf.set_font("Helvetica", "I", 9)
     pdf.cell(0, 6, "This report is informational. Always verify locally and follow safety guidelines.", ln=True)
     pdf.cell(0, 6, "RangeGuard - Promoting coexistence between hikers and hunters.", ln=True)
+    return bytes(pdf.output())
+
+@api_router.post("/reports/pdf")
+async def generate_pdf_report(data: IntersectionRequest):
+    # First run intersection check
+    check_time = data.check_time or datetime.now(timezone.utc).isoformat()
+    
+    route_geom_data = data.route_geometry
+    route_name = "Uploaded Route"
+    if data.route_id:
+        route = await db.routes.find_one({"id": data.route_id}, {"_id": 0})
+        if not route:
+            raise HTTPException(status_code=404, detail="Route not found")
+        route_geom_data = route["geometry"]
+        route_name = route.get("name", "Route")
+    
+    if not route_geom_data:
+        raise HTTPException(status_code=400, detail="No route geometry provided")
+    
+    try:
+        check_at = parse_time(check_time)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid check time")
     
-    buffer = io.BytesIO()
-    pdf_output = pdf.output()
-    buffer.write(pdf_output)
-    buffer.seek(0)
+    # Stored routes are keyed by id, ad-hoc geometry by its hash
+    key = (
+        await zones_generation(), "pdf",
+        data.route_id or geometry_key(route_geom_data),
+        data.check_time or int(time.time() // ISECT_NOW_BUCKET)
+    )
+    intersecting = _isect_cache.get(key)
+    if intersecting is None:
+        active_zones = await find_zones_touching(route_geom_data, {
+            "start_at": {"$lte": check_at},
+            "end_at": {"$gte": check_at}
+        })
+        
+        route_shape = get_route_shape(data.route_id, route_geom_data) if data.route_id else shape(route_geom_data)
+        # Rows hold the final cell text, so cached reports render without further string work
+        intersecting = [
+            {
+                "name": pdf_text(zone["name"], 25),
+                "association": pdf_text(zone.get("association_name", ""), 20),
+                "start": zone["start_time"][:16],
+                "end": zone["end_time"][:16],
+                "overlap": f"{overlap_pct}%"
+            }
+            for zone, _, overlap_pct in find_zone_overlaps(route_shape, active_zones)
+        ]
+        _isect_cache[key] = intersecting
     
-    return StreamingResponse(
-        buffer,
+    # fpdf rendering is CPU-bound; keep it off the event loop
+    pdf_bytes = await asyncio.to_thread(render_pdf_report, route_name, check_time, intersecting)
+    return Response(
+        content=pdf_bytes,
         media_type="application/pdf",
         headers={"Content-Disposition": f"attachment; filename=rangeguard_report_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M')}.pdf"}
     )
@@ -937,14 +1542,18 @@ async def generate_pdf_report(data: IntersectionRequest):
 
 @api_router.get("/stats")
 async def get_stats():
-    total_zones = await db.zones.count_documents({})
-    now = datetime.now(timezone.utc).isoformat()
-    active_zones = await db.zones.count_documents({
-        "start_time": {"$lte": now},
-        "end_time": {"$gte": now}
-    })
-    total_users = await db.users.count_documents({})
-    total_routes = await db.routes.count_documents({})
+    now = datetime.now(timezone.utc)
+    # Independent counts: issue them together instead of one round-trip after another.
+    # Unfiltered totals come from collection metadata rather than a count scan.
+    total_zones, active_zones, total_users, total_routes = await asyncio.gather(
+        db.zones.estimated_document_count(),
+        db.zones.count_documents({
+            "start_at": {"$lte": now},
+            "end_at": {"$gte": now}
+        }),
+        db.users.estimated_document_count(),
+        db.routes.estimated_document_count()
+    )
     return {
         "total_zones": total_zones,
         "active_zones": active_zones,
@@ -959,6 +1568,18 @@ async def root():
 # ==================== INCLUIR ROUTER Y MIDDLEWARE ====================
 app.include_router(api_router)
 
+# Multipart framing and the name field, on top of the GPX file itself
+UPLOAD_OVERHEAD_BYTES = 64 * 1024
+
+@app.middleware("http")
+async def reject_oversized_uploads(request, call_next):
+    """Answer 413 from Content-Length before an upload body is received and spooled to disk."""
+    if request.url.path == "/api/routes/upload":
+        length = request.headers.get("content-length", "")
+        if length.isdigit() and int(length) > MAX_GPX_BYTES + UPLOAD_OVERHEAD_BYTES:
+            return JSONResponse(status_code=413, content={"detail": GPX_TOO_LARGE})
+    return await call_next(request)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -967,28 +1588,118 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Route and zone geometry is verbose JSON; PDFs only gain a little (fpdf already deflates them)
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # ==================== STARTUP Y SHUTDOWN EVENTS ====================
+async def backfill_zone_dates():
+    """Give zones stored before start_at/end_at existed their BSON date fields."""
+    ops = []
+    async for zone in db.zones.find({"start_at": {"$exists": False}}, {"_id": 0, "id": 1, "start_time": 1, "end_time": 1}):
+        try:
+            start_at, end_at = parse_time(zone["start_time"]), parse_time(zone["end_time"])
+        except (KeyError, ValueError) as e:
+            logger.error(f"Cannot backfill dates for zone {zone.get('id')}: {e}")
+            continue
+        ops.append(UpdateOne({"id": zone["id"]}, {"$set": {"start_at": start_at, "end_at": end_at}}))
+    if ops:
+        await db.zones.bulk_write(ops, ordered=False)
+        logger.info(f"Backfilled start_at/end_at on {len(ops)} zones")
+
+async def backfill_zone_bboxes():
+    """Store bbox/buffered_bbox on zones created before they existed, so the STRtree
+    and bbox rejects never have to parse their GeoJSON."""
+    ops = []
+    async for zone in db.zones.find(
+        {"buffered_bbox": {"$exists": False}}, {"_id": 0, "id": 1, "geometry": 1, "buffered_geometry": 1}
+    ):
+        try:
+            original = shape(zone["geometry"])
+            buffered = shape(zone["buffered_geometry"]) if zone.get("buffered_geometry") else original
+        except Exception as e:
+            logger.error(f"Cannot backfill bbox for zone {zone.get('id')}: {e}")
+            continue
+        ops.append(UpdateOne({"id": zone["id"]}, {"$set": {
+            "bbox": list(original.bounds), "buffered_bbox": list(buffered.bounds)
+        }}))
+    if ops:
+        await db.zones.bulk_write(ops, ordered=False)
+        logger.info(f"Backfilled bbox/buffered_bbox on {len(ops)} zones")
+
+async def backfill_route_name_words():
+    """Give routes stored before name_words existed their search words."""
+    ops = [
+        UpdateOne({"id": route["id"]}, {"$set": {"name_words": name_words(route.get("name") or "")}})
+        async for route in db.routes.find({"name_words": {"$exists": False}}, {"_id": 0, "id": 1, "name": 1})
+    ]
+    if ops:
+        await db.routes.bulk_write(ops, ordered=False)
+        logger.info(f"Backfilled name_words on {len(ops)} routes")
+
 @app.on_event("startup")
 async def startup_db():
+    global redis_client
+    if REDIS_URL:
+        try:
+            import redis.asyncio as aioredis
+            redis_client = aioredis.from_url(REDIS_URL, decode_responses=True)
+            await redis_client.ping()
+            logger.info("Redis cache enabled")
+        except Exception as e:
+            logger.error(f"Redis unavailable, using in-process caches only: {e}")
+            redis_client = None
     # Create indexes for geospatial queries
     try:
         await db.zones.create_index("id", unique=True)
+        # end_at leads: past zones pile up, and the upload check filters on end_at alone
+        await db.zones.create_index([("end_at", 1), ("start_at", 1)])
+        await db.zones.create_index("created_by")
         await db.users.create_index("id", unique=True)
         await db.users.create_index("email", unique=True)
         await db.routes.create_index("id", unique=True)
         await db.routes.create_index("user_id")
+        await db.routes.create_index("is_public")
+        await db.routes.create_index("name_words")
         await db.notifications.create_index("id", unique=True)
-        await db.notifications.create_index([("user_id", 1), ("read", 1)])
+        await db.notifications.create_index([("user_id", 1), ("read", 1), ("created_at", -1)])
         await db.notifications.create_index([("user_id", 1), ("created_at", -1)])
         await db.favorites.create_index([("user_id", 1), ("route_id", 1)], unique=True)
         await db.favorites.create_index("route_id")
         logger.info("Database indexes created successfully")
     except Exception as e:
         logger.error(f"Index creation error: {e}")
+    try:
+        await backfill_zone_dates()
+    except Exception as e:
+        logger.error(f"Zone date backfill error: {e}")
+    try:
+        await backfill_zone_bboxes()
+    except Exception as e:
+        logger.error(f"Zone bbox backfill error: {e}")
+    try:
+        await backfill_route_name_words()
+    except Exception as e:
+        logger.error(f"Route name backfill error: {e}")
+    # Kept separate: fails while older duplicate route warnings are still stored
+    try:
+        await db.notifications.create_index(
+            [("user_id", 1), ("data.route_id", 1), ("data.zone_id", 1), ("type", 1)],
+            unique=True,
+            partialFilterExpression={"type": "route_warning"}
+        )
+    except Exception as e:
+        logger.error(f"Route warning index creation error: {e}")
+    # Kept separate: fails if stored zones hold geometry Mongo considers invalid
+    try:
+        await db.zones.create_index([("buffered_geometry", "2dsphere"), ("start_at", 1), ("end_at", 1)])
+    except Exception as e:
+        logger.error(f"Geospatial index creation error: {e}")
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
+    await client.close()
+    if redis_client is not None:
+        await redis_client.aclose()
 
 
 # ==================== PARA EJECUCIÓN EN RENDER / LOCAL ====================
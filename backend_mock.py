@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+In-process stand-in for the RangeGuard API, built on respx.
+Lets backend_test.py / debug_intersection.py run with --mock: no network, canned data,
+favorites state kept in memory so the add/remove checks still mean something.
+"""
+import httpx
+import orjson
+import respx
+
+MOCK_BASE_URL = "http://rangeguard.mock"
+
+MOCK_USER = {"id": "mock-user", "email": "hiker@test.com", "name": "Hiker", "role": "user"}
+
+MOCK_ROUTES = [
+    {
+        "id": "mock-route-1",
+        "name": "Sierra Norte loop",
+        "owner_name": "Hiker",
+        "user_id": "mock-user",
+        "point_count": 3,
+        "created_at": "2025-01-01T00:00:00+00:00",
+        "geometry": {"type": "LineString", "coordinates": [[-3.7, 40.45], [-3.69, 40.44], [-3.68, 40.43]]},
+    },
+]
+
+def _json(payload, status_code=200):
+    return httpx.Response(status_code, content=orjson.dumps(payload),
+                          headers={"Content-Type": "application/json"})
+
+def mock_api(api_url):
+    """respx router answering the endpoints the test scripts call; use as a context manager"""
+    routes = {r["id"]: r for r in MOCK_ROUTES}
+    favorites = {}  # route_id -> favorite doc
+
+    def favorite_entries():
+        return [{
+            "favorite_id": fav["id"],
+            "route_id": route_id,
+            "route_name": routes[route_id]["name"],
+            "owner_name": routes[route_id]["owner_name"],
+            "geometry": routes[route_id]["geometry"],
+            "is_own": routes[route_id]["user_id"] == MOCK_USER["id"],
+            "favorited_at": fav["created_at"],
+            "route_created_at": routes[route_id]["created_at"],
+        } for route_id, fav in favorites.items()]
+
+    def add(route_id):
+        favorites[route_id] = {
+            "id": f"mock-fav-{route_id}",
+            "user_id": MOCK_USER["id"],
+            "route_id": route_id,
+            "route_name": routes[route_id]["name"],
+            "owner_name": routes[route_id]["owner_name"],
+            "created_at": "2025-01-01T00:00:00+00:00",
+        }
+        return favorites[route_id]
+
+    def public_routes(request):
+        search = request.url.params.get("search", "").lower()
+        listed = [{k: v for k, v in r.items() if k != "geometry"} for r in routes.values()]
+        return _json([r for r in listed if search in r["name"].lower()])
+
+    def batch(request):
+        data = orjson.loads(request.content)
+        added = [r for r in data.get("add", []) if r in routes and r not in favorites]
+        for route_id in added:
+            add(route_id)
+        removed = [r for r in data.get("remove", []) if favorites.pop(r, None)]
+        result = {"added": added, "removed": removed}
+        if data.get("include_state"):
+            entries = favorite_entries()
+            result["state"] = {"ids": [f["route_id"] for f in entries], "favorites": entries}
+        return _json(result)
+
+    def add_one(request, route_id):
+        if route_id not in routes:
+            return _json({"detail": "Route not found"}, 404)
+        if route_id in favorites:
+            return _json({"detail": "Already in favorites"}, 400)
+        return _json(add(route_id))
+
+    def remove_one(request, route_id):
+        if favorites.pop(route_id, None) is None:
+            return _json({"detail": "Not in favorites"}, 404)
+        return _json({"message": "Removed from favorites"})
+
+    def check_batch(request):
+        data = orjson.loads(request.content)
+        safe = {"intersects": False, "zones": [], "safe_message": "Safe: No conflicts with active hunting zones."}
+        return _json({"results": [safe for _ in data.get("routes", [])]})
+
+    router = respx.mock(base_url=api_url, assert_all_called=False)
+    router.post("/auth/login").mock(return_value=_json({"token": "mock-token", "user": MOCK_USER}))
+    router.get("/stats").mock(return_value=_json(
+        {"total_zones": 0, "active_zones": 0, "total_users": 1, "total_routes": len(routes)}
+    ))
+    router.get("/routes/public").mock(side_effect=public_routes)
+    router.get("/favorites/ids").mock(side_effect=lambda request: _json(list(favorites)))
+    router.get("/favorites").mock(side_effect=lambda request: _json(favorite_entries()))
+    router.post("/favorites/batch").mock(side_effect=batch)
+    router.post(path__regex=r"/favorites/(?P<route_id>[^/]+)$").mock(side_effect=add_one)
+    router.delete(path__regex=r"/favorites/(?P<route_id>[^/]+)$").mock(side_effect=remove_one)
+    router.post("/check-intersection/batch").mock(side_effect=check_batch)
+    return router
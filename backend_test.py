@@ -1,12 +1,54 @@
 #!/usr/bin/env python3
-import requests
 import sys
-import json
+import os
+import orjson
+import pytest
+import argparse
+import io
+import re
+import statistics
+from collections import defaultdict
+import base64
+import time
+import contextlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import uuid
 from datetime import datetime, timezone
 
+from api_helpers import DEFAULT_BASE_URL, POOL_SIZE, cassette, make_client
+
+# Request bodies that never change, serialized once
+_LOGIN_BODY = orjson.dumps({"email": "hiker@test.com", "password": "test1234"})
+
+# Fields each response shape must carry
+_STATS_FIELDS = frozenset({"total_zones", "active_zones", "total_users", "total_routes"})
+_ROUTE_FIELDS = frozenset({"id", "name", "owner_name", "point_count"})
+_ADD_FAV_FIELDS = frozenset({"id", "user_id", "route_id", "route_name", "owner_name"})
+_FAVORITE_FIELDS = frozenset({"favorite_id", "route_id", "route_name", "owner_name", "geometry"})
+_GEOMETRY_FIELDS = frozenset({"type", "coordinates"})
+
+# Gateway errors worth retrying, and only for methods that are safe to repeat
+RETRY_STATUSES = frozenset({502, 503, 504})
+RETRY_METHODS = frozenset({"GET", "PUT", "DELETE"})
+MAX_RETRIES = 2
+RETRY_BACKOFF = 0.1  # seconds, doubled per attempt
+
+_ID_SEGMENT = re.compile(r"[0-9a-f]{32}")
+
+TOKEN_CACHE_PATH = os.path.expanduser("~/.cache/rangeguard_test_token.json")
+
+def _jwt_exp(token):
+    """Read the exp claim of a JWT without verifying it; None if it has none"""
+    try:
+        segment = token.split(".")[1]
+        claims = orjson.loads(base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4)))
+        return float(claims["exp"])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
 class HuntingSafetyAPITester:
-    def __init__(self, base_url="https://cotos-check.preview.emergentagent.com"):
+    def __init__(self, base_url=DEFAULT_BASE_URL, use_token_cache=True, verbose=False, latency_baseline=None):
         self.base_url = base_url
         self.api_url = f"{base_url}/api"
         self.token = None
@@ -14,61 +56,177 @@ class HuntingSafetyAPITester:
         self.tests_passed = 0
         self.failed_tests = []
         self.user_id = None
+        self._lock = threading.Lock()
+        self._get_cache = {}  # endpoint -> parsed body of a successful cached GET
+        # Output is buffered and written once at the end unless verbose
+        self.verbose = verbose
+        self._out = io.StringIO()
+        self._task_out = threading.local()
+        # Per-endpoint request latencies (ns); baseline maps endpoint -> allowed p95 in ms
+        self._latencies = defaultdict(list)
+        self.latency_baseline = latency_baseline or {}
+        self.client = make_client(self.api_url)
+        self._cached_login = self._load_cached_token() if use_token_cache else None
+
+    def _load_cached_token(self):
+        """Token saved by an earlier run against the same host, if still valid for a minute"""
+        try:
+            with open(TOKEN_CACHE_PATH, "rb") as f:
+                cached = orjson.loads(f.read())
+        except (OSError, ValueError):
+            return None
+        if cached.get("base_url") != self.base_url or cached.get("exp", 0) <= time.time() + 60:
+            return None
+        return cached
+
+    def _save_token(self):
+        """Persist the current token (owner-only permissions) so later runs can skip login"""
+        exp = _jwt_exp(self.token)
+        if exp is None:
+            return
+        os.makedirs(os.path.dirname(TOKEN_CACHE_PATH), exist_ok=True)
+        fd = os.open(TOKEN_CACHE_PATH, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(orjson.dumps({
+                "base_url": self.base_url, "token": self.token, "exp": exp, "user_id": self.user_id
+            }))
+
+    def say(self, line=""):
+        """Print a line now when verbose, otherwise buffer it until flush_output"""
+        task_lines = getattr(self._task_out, "lines", None)
+        if task_lines is not None:
+            task_lines.append(line)
+        elif self.verbose:
+            print(line)
+        else:
+            self._out.write(line + "\n")
+
+    def flush_output(self):
+        """Write buffered output to stdout in one go"""
+        sys.stdout.write(self._out.getvalue())
+        sys.stdout.flush()
+        self._out = io.StringIO()
 
     def log_test(self, name, success, response=None, status_code=None):
         """Log test result"""
-        self.tests_run += 1
+        with self._lock:
+            self.tests_run += 1
+            if success:
+                self.tests_passed += 1
         if success:
-            self.tests_passed += 1
-            print(f"✅ {name} - PASSED")
+            self.say(f"✅ {name} - PASSED")
         else:
-            print(f"❌ {name} - FAILED")
+            self.say(f"❌ {name} - FAILED")
             if status_code:
-                print(f"   Status: {status_code}")
+                self.say(f"   Status: {status_code}")
             if response:
-                print(f"   Response: {response}")
+                self.say(f"   Response: {response}")
             self.failed_tests.append(f"{name}: {status_code} - {response}")
 
-    def run_test(self, name, method, endpoint, expected_status, data=None, headers=None):
-        """Run a single API test"""
+    def run_test(self, name, method, endpoint, expected_status, data=None, headers=None, use_cache=False, parse=True):
+        """Run a single API test; with use_cache, a GET already answered is served from memory.
+        parse=False only checks the status and never decodes the body"""
+        if use_cache and method == 'GET' and endpoint in self._get_cache:
+            return True, self._get_cache[endpoint]
+
         url = f"{self.api_url}/{endpoint}"
-        
-        # Default headers
-        test_headers = {'Content-Type': 'application/json'}
-        if self.token:
-            test_headers['Authorization'] = f'Bearer {self.token}'
-        if headers:
-            test_headers.update(headers)
-
-        print(f"\n🔍 Testing {name}...")
-        print(f"   URL: {url}")
+
+        self.say(f"\n🔍 Testing {name}...")
+        self.say(f"   URL: {url}")
         
         try:
-            if method == 'GET':
-                response = requests.get(url, headers=test_headers, timeout=30)
-            elif method == 'POST':
-                response = requests.post(url, json=data, headers=test_headers, timeout=30)
-            elif method == 'PUT':
-                response = requests.put(url, json=data, headers=test_headers, timeout=30)
-            elif method == 'DELETE':
-                response = requests.delete(url, headers=test_headers, timeout=30)
-
-            success = response.status_code == expected_status
-            
-            if success:
-                self.log_test(name, True)
-                try:
-                    return True, response.json() if response.text else {}
-                except:
-                    return True, {}
-            else:
+            # Client headers carry Content-Type and the bearer token
+            # Pre-serialized bodies (bytes) are sent as-is
+            body = data if data is None or isinstance(data, bytes) else orjson.dumps(data)
+            for attempt in range(MAX_RETRIES + 1):
+                t0 = time.perf_counter_ns()
+                response = self.client.request(method, endpoint, content=body, headers=headers)
+                self._latencies[f"{method} {_ID_SEGMENT.sub('{id}', endpoint.split('?')[0])}"].append(
+                    time.perf_counter_ns() - t0
+                )
+                if (response.status_code not in RETRY_STATUSES or method not in RETRY_METHODS
+                        or attempt == MAX_RETRIES):
+                    break
+                time.sleep(RETRY_BACKOFF * 2 ** attempt)
+
+            if response.status_code != expected_status:
                 self.log_test(name, False, response.text, response.status_code)
+                if response.status_code == 401 and self._cached_login:
+                    # Stale cached token (secret rotated, user recreated): log in afresh next run
+                    with contextlib.suppress(OSError):
+                        os.remove(TOKEN_CACHE_PATH)
                 return False, {}
 
+            self.log_test(name, True)
+            raw = response.content
+            if not parse or not raw:
+                return True, {}
+            try:
+                payload = orjson.loads(raw)
+            except orjson.JSONDecodeError:
+                return True, {}
+            if use_cache and method == 'GET':
+                self._get_cache[endpoint] = payload
+            return True, payload
+
         except Exception as e:
             self.log_test(name, False, str(e))
             return False, {}
 
+    def _require_fields(self, resp, fields, label):
+        """Check resp carries every key in fields, recording a failure otherwise"""
+        missing = fields - resp.keys()
+        if missing:
+            self.say(f"   ⚠️  Missing required fields in {label}: {sorted(missing)}")
+            self.failed_tests.append(f"{label} missing fields: {sorted(missing)}")
+            return False
+        return True
+
+    def _require_favorite(self, fav, label):
+        """Check a favorites entry has the expected fields and a usable geometry"""
+        if not self._require_fields(fav, _FAVORITE_FIELDS, label):
+            return False
+        geometry = fav['geometry']
+        if not isinstance(geometry, dict) or not geometry.keys() >= _GEOMETRY_FIELDS:
+            self.say(f"   ⚠️  Invalid geometry in {label}")
+            self.failed_tests.append(f"{label} missing valid geometry")
+            return False
+        return True
+
+    def report_latencies(self):
+        """Print p50/p95 per endpoint and record a failure for any p95 above its baseline"""
+        self.say("\n⏱️  LATENCY (ms)")
+        for endpoint, samples in sorted(self._latencies.items()):
+            if len(samples) > 1:
+                cuts = statistics.quantiles(samples, n=20, method="inclusive")
+                p50, p95 = cuts[9] / 1e6, cuts[18] / 1e6
+            else:
+                p50 = p95 = samples[0] / 1e6
+            self.say(f"   {endpoint:<32} n={len(samples):<3} p50={p50:8.1f}  p95={p95:8.1f}")
+            limit = self.latency_baseline.get(endpoint)
+            if limit is not None and p95 > limit:
+                self.failed_tests.append(f"Latency SLO: {endpoint} p95 {p95:.1f} ms > {limit} ms")
+
+    def run_parallel(self, *tests):
+        """Run independent read-only tests concurrently, returning results in order.
+        Each test's output is collected separately and emitted in order, so lines never interleave"""
+        def run(test):
+            self._task_out.lines = []
+            try:
+                return test(), self._task_out.lines
+            finally:
+                self._task_out.lines = None
+
+        with ThreadPoolExecutor(max_workers=min(len(tests), POOL_SIZE)) as pool:
+            futures = [pool.submit(run, test) for test in tests]
+            results = []
+            for future in futures:
+                result, lines = future.result()
+                for line in lines:
+                    self.say(line)
+                results.append(result)
+            return results
+
     def test_stats_endpoint(self):
         """Test GET /api/stats"""
         success, response = self.run_test(
@@ -78,33 +236,34 @@ class HuntingSafetyAPITester:
             200
         )
         if success:
-            expected_keys = ["total_zones", "active_zones", "total_users", "total_routes"]
-            missing_keys = [k for k in expected_keys if k not in response]
-            if missing_keys:
-                print(f"   Warning: Missing keys in stats: {missing_keys}")
+            if not self._require_fields(response, _STATS_FIELDS, "Stats"):
                 return False
-            print(f"   Stats: {response}")
+            self.say(f"   Stats: {response}")
         return success
 
     def test_login_hiker(self):
-        """Test login with hiker@test.com/test1234"""
-        login_data = {
-            "email": "hiker@test.com",
-            "password": "test1234"
-        }
-        
+        """Test login with hiker@test.com/test1234, reusing a cached token when one is valid"""
+        if self._cached_login:
+            self.token = self._cached_login["token"]
+            self.client.headers['Authorization'] = f'Bearer {self.token}'
+            self.user_id = self._cached_login.get("user_id")
+            self.log_test("Hiker Login (cached token)", True)
+            return True
+
         success, response = self.run_test(
             "Hiker Login",
             "POST",
             "auth/login",
             200,
-            login_data
+            _LOGIN_BODY
         )
         
         if success and 'token' in response:
             self.token = response['token']
+            self.client.headers['Authorization'] = f'Bearer {self.token}'
             self.user_id = response.get('user', {}).get('id')
-            print(f"   Hiker login successful, token received")
+            self.say(f"   Hiker login successful, token received")
+            self._save_token()
         
         return success
 
@@ -114,21 +273,18 @@ class HuntingSafetyAPITester:
             "Get Public Routes",
             "GET",
             "routes/public",
-            200
+            200,
+            use_cache=True
         )
         
         if success and isinstance(response, list):
-            print(f"   Found {len(response)} public routes")
+            self.say(f"   Found {len(response)} public routes")
             if response:
                 sample_route = response[0]
-                expected_fields = ['id', 'name', 'owner_name', 'point_count']
-                missing_fields = [f for f in expected_fields if f not in sample_route]
-                if missing_fields:
-                    print(f"   ⚠️  Missing required fields in route: {missing_fields}")
-                    self.failed_tests.append(f"Public routes missing fields: {missing_fields}")
+                if not self._require_fields(sample_route, _ROUTE_FIELDS, "Public route"):
                     return False
                 else:
-                    print(f"   ✅ Route has required fields: owner_name='{sample_route.get('owner_name')}', point_count={sample_route.get('point_count')}")
+                    self.say(f"   ✅ Route has required fields: owner_name='{sample_route.get('owner_name')}', point_count={sample_route.get('point_count')}")
         
         return success
 
@@ -142,7 +298,7 @@ class HuntingSafetyAPITester:
         )
         
         if success:
-            print(f"   Found {len(response)} routes matching 'Sierra'")
+            self.say(f"   Found {len(response)} routes matching 'Sierra'")
         
         return success
 
@@ -156,17 +312,15 @@ class HuntingSafetyAPITester:
         )
         
         if success:
-            expected_fields = ['id', 'user_id', 'route_id', 'route_name', 'owner_name']
-            missing_fields = [f for f in expected_fields if f not in response]
-            if missing_fields:
-                print(f"   ⚠️  Missing fields in favorite response: {missing_fields}")
-                self.failed_tests.append(f"Add favorite missing fields: {missing_fields}")
+            if not self._require_fields(response, _ADD_FAV_FIELDS, "Add favorite response"):
                 return False
         
         return success
 
-    def test_get_favorites(self):
-        """Test GET /api/favorites returns user's favorited routes with geometry"""
+    def test_get_favorites(self, route_id=None, present=True):
+        """Test GET /api/favorites returns user's favorited routes with geometry.
+        With route_id, also check it is (or is not) among them: the ids come from this
+        response, so no separate favorites/ids call is needed"""
         success, response = self.run_test(
             "Get User Favorites",
             "GET",
@@ -175,23 +329,16 @@ class HuntingSafetyAPITester:
         )
         
         if success and isinstance(response, list):
-            print(f"   Found {len(response)} favorite routes")
+            self.say(f"   Found {len(response)} favorite routes")
             if response:
-                sample_fav = response[0]
-                expected_fields = ['favorite_id', 'route_id', 'route_name', 'owner_name', 'geometry']
-                missing_fields = [f for f in expected_fields if f not in sample_fav]
-                if missing_fields:
-                    print(f"   ⚠️  Missing required fields in favorite: {missing_fields}")
-                    self.failed_tests.append(f"Favorites missing fields: {missing_fields}")
+                if not self._require_favorite(response[0], "Favorite"):
                     return False
-                else:
-                    print(f"   ✅ Favorite has required fields including geometry")
-                    # Check if geometry is valid
-                    geometry = sample_fav.get('geometry', {})
-                    if not geometry or 'coordinates' not in geometry:
-                        print(f"   ⚠️  Invalid geometry in favorite")
-                        self.failed_tests.append("Favorites missing valid geometry")
-                        return False
+                self.say(f"   ✅ Favorite has required fields including geometry")
+            if route_id is not None and (route_id in {f['route_id'] for f in response}) != present:
+                state = "missing from" if present else "still in"
+                self.say(f"   ⚠️  Route {route_id} {state} favorites")
+                self.failed_tests.append(f"Route {route_id} {state} favorites")
+                return False
         
         return success
 
@@ -206,10 +353,10 @@ class HuntingSafetyAPITester:
         
         if success:
             if not isinstance(response, list):
-                print(f"   ⚠️  Response should be an array, got {type(response)}")
+                self.say(f"   ⚠️  Response should be an array, got {type(response)}")
                 self.failed_tests.append("Favorite IDs should return array")
                 return False
-            print(f"   Found {len(response)} favorite route IDs")
+            self.say(f"   Found {len(response)} favorite route IDs")
         
         return success
 
@@ -219,85 +366,201 @@ class HuntingSafetyAPITester:
             f"Remove Favorite Route {route_id}",
             "DELETE",
             f"favorites/{route_id}",
-            200
+            200,
+            parse=False
         )
         
         return success
 
-    def run_all_tests(self):
+    def test_batch_favorites(self, add=(), remove=()):
+        """Test POST /api/favorites/batch applies the mutation and returns the resulting state inline"""
+        success, response = self.run_test(
+            f"Batch Favorites (add={list(add)}, remove={list(remove)})",
+            "POST",
+            "favorites/batch",
+            200,
+            {"add": list(add), "remove": list(remove), "include_state": True}
+        )
+        
+        if success:
+            state = response.get('state', {})
+            ids = state.get('ids')
+            favorites = state.get('favorites')
+            if not isinstance(ids, list) or not isinstance(favorites, list):
+                self.say(f"   ⚠️  Batch response missing state.ids/state.favorites")
+                self.failed_tests.append("Batch favorites missing state")
+                return False
+            wrong = [r for r in add if r not in ids] + [r for r in remove if r in ids]
+            if wrong:
+                self.say(f"   ⚠️  Favorites state not updated for: {wrong}")
+                self.failed_tests.append(f"Batch favorites state not updated for: {wrong}")
+                return False
+            for fav in favorites:
+                if not self._require_favorite(fav, "Batch favorite"):
+                    return False
+            self.say(f"   ✅ State has {len(ids)} favorites after batch")
+        
+        return success
+
+    def run_all_tests(self, legacy_favorites=False):
         """Run all backend tests for explore routes functionality"""
-        print("="*60)
-        print("🚀 Starting Hunting Safety Web App - Explore Routes Feature Tests")
-        print(f"📍 Base URL: {self.base_url}")
-        print("="*60)
+        self.say("="*60)
+        self.say("🚀 Starting Hunting Safety Web App - Explore Routes Feature Tests")
+        self.say(f"📍 Base URL: {self.base_url}")
+        self.say("="*60)
 
         # Test 1: Login as hiker user (from context)
-        print("\n📋 AUTHENTICATION TESTS")
+        self.say("\n📋 AUTHENTICATION TESTS")
         login_success = self.test_login_hiker()
         if not login_success:
-            print("❌ Cannot proceed without authentication")
+            self.say("❌ Cannot proceed without authentication")
+            self.flush_output()
             return False
 
-        # Test 2: Public Routes API - GET /api/routes/public
-        print("\n📋 PUBLIC ROUTES API TESTS")
-        public_routes_success = self.test_public_routes()
-        public_routes_search_success = self.test_public_routes_search()
+        # Test 2: Read-only endpoints, independent of each other so they run concurrently
+        self.say("\n📋 STATS, PUBLIC ROUTES AND FAVORITES STATE TESTS")
+        (stats_success, public_routes_success, public_routes_search_success,
+         initial_fav_ids_success, initial_favs_success) = self.run_parallel(
+            self.test_stats_endpoint, self.test_public_routes, self.test_public_routes_search,
+            self.test_get_favorite_ids, self.test_get_favorites
+        )
 
-        # Get some routes for favorites testing
-        print("\n📋 GETTING ROUTE DATA FOR FAVORITES TESTS")
-        success, public_routes = self.run_test("Get Routes for Testing", "GET", "routes/public", 200)
-        
-        if not success or not public_routes:
-            print("❌ No public routes available for favorites testing")
+        # Reuse the public route list fetched above for favorites testing
+        public_routes = self._get_cache.get("routes/public")
+        if not public_routes:
+            self.say("❌ No public routes available for favorites testing")
+            self.flush_output()
             return False
 
         # Test 3: Favorites API - All endpoints
-        print("\n📋 FAVORITES API TESTS")
+        self.say("\n📋 FAVORITES API TESTS")
         test_route_id = public_routes[0]['id']
-        print(f"   Using test route ID: {test_route_id}")
+        self.say(f"   Using test route ID: {test_route_id}")
+
+        # Add and remove through the batch endpoint; each call returns the state to verify
+        batch_add_success = self.test_batch_favorites(add=[test_route_id])
+        batch_remove_success = self.test_batch_favorites(remove=[test_route_id])
 
-        # Get initial favorites state
-        initial_fav_ids_success = self.test_get_favorite_ids()
-        initial_favs_success = self.test_get_favorites()
+        if legacy_favorites:
+            # Per-id endpoints, kept as a regression check
+            self.say("\n📋 LEGACY PER-ID FAVORITES TESTS")
+            # Add to favorites
+            add_fav_success = self.test_add_favorite(test_route_id)
 
-        # Add to favorites
-        add_fav_success = self.test_add_favorite(test_route_id)
+            # Verify it was added
+            if add_fav_success:
+                after_add_favs_success = self.test_get_favorites(test_route_id, present=True)
 
-        # Verify it was added
-        if add_fav_success:
-            after_add_ids_success = self.test_get_favorite_ids()
-            after_add_favs_success = self.test_get_favorites()
+            # Remove from favorites
+            remove_fav_success = self.test_remove_favorite(test_route_id)
 
-        # Remove from favorites
-        remove_fav_success = self.test_remove_favorite(test_route_id)
+            # Verify it was removed
+            if remove_fav_success:
+                after_remove_favs_success = self.test_get_favorites(test_route_id, present=False)
 
-        # Verify it was removed
-        if remove_fav_success:
-            after_remove_ids_success = self.test_get_favorite_ids()
-            after_remove_favs_success = self.test_get_favorites()
+        self.report_latencies()
 
         # Print results
-        print("\n" + "="*60)
-        print("📊 TEST RESULTS - EXPLORE ROUTES FEATURE")
-        print("="*60)
-        print(f"Tests run: {self.tests_run}")
-        print(f"Tests passed: {self.tests_passed}")
-        print(f"Tests failed: {self.tests_run - self.tests_passed}")
+        self.say("\n" + "="*60)
+        self.say("📊 TEST RESULTS - EXPLORE ROUTES FEATURE")
+        self.say("="*60)
+        self.say(f"Tests run: {self.tests_run}")
+        self.say(f"Tests passed: {self.tests_passed}")
+        self.say(f"Tests failed: {self.tests_run - self.tests_passed}")
         
         if self.failed_tests:
-            print(f"\n❌ Failed tests ({len(self.failed_tests)}):")
+            self.say(f"\n❌ Failed tests ({len(self.failed_tests)}):")
             for failed in self.failed_tests:
-                print(f"   - {failed}")
+                self.say(f"   - {failed}")
         
         success_rate = (self.tests_passed / self.tests_run * 100) if self.tests_run > 0 else 0
-        print(f"Success rate: {success_rate:.1f}%")
-        print("="*60)
+        self.say(f"Success rate: {success_rate:.1f}%")
+        self.say("="*60)
+        self.flush_output()
 
         return len(self.failed_tests) == 0
 
-def main():
-    tester = HuntingSafetyAPITester()
-    success = tester.run_all_tests()
+# pytest entry points over the same checks: `pytest -n 4 backend_test.py` (pytest-xdist) spreads
+# them across workers, each with its own client and login. Every test runs once per mode:
+# "mocked" against backend_mock (the default) and "live" against DEFAULT_BASE_URL, which is
+# skipped unless --live or RANGEGUARD_API is given (see conftest.py). `-m mocked` / `-m live`
+# pick one mode.
+
+@pytest.fixture(scope="session", params=[
+    pytest.param("mocked", marks=pytest.mark.mocked),
+    pytest.param("live", marks=pytest.mark.live),
+])
+def tester(request):
+    """Logged-in tester shared by every test in this worker, per mode"""
+    if request.param == "mocked":
+        from backend_mock import MOCK_BASE_URL, mock_api
+        t = HuntingSafetyAPITester(MOCK_BASE_URL, use_token_cache=False, verbose=True)
+        context = mock_api(t.api_url)
+    else:
+        t = HuntingSafetyAPITester(verbose=True)
+        context = contextlib.nullcontext()
+    with context, t.client:
+        assert t.test_login_hiker(), t.failed_tests
+        yield t
+
+@pytest.fixture(scope="session")
+def public_route_id(tester):
+    """Id of the first public route, fetched once per worker"""
+    success, routes = tester.run_test("Get Routes for Testing", "GET", "routes/public", 200, use_cache=True)
+    if not success or not routes:
+        pytest.skip("No public routes available for favorites testing")
+    return routes[0]["id"]
+
+def test_stats(tester):
+    assert tester.test_stats_endpoint(), tester.failed_tests
+
+def test_public_routes(tester):
+    assert tester.test_public_routes(), tester.failed_tests
+
+def test_public_routes_search(tester):
+    assert tester.test_public_routes_search(), tester.failed_tests
+
+def test_favorites_state(tester):
+    assert tester.test_get_favorite_ids(), tester.failed_tests
+    assert tester.test_get_favorites(), tester.failed_tests
+
+def test_favorites_add_remove(tester, public_route_id):
+    # Add and remove stay in one test so xdist never splits the producer from its consumer
+    assert tester.test_batch_favorites(add=[public_route_id]), tester.failed_tests
+    assert tester.test_batch_favorites(remove=[public_route_id]), tester.failed_tests
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Explore routes / favorites API tests")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--cassette", action="store_true",
+                        help="record responses on the first run and replay them from disk afterwards (needs vcrpy)")
+    source.add_argument("--mock", action="store_true",
+                        help="run against the in-process respx stand-in from backend_mock.py instead of a server")
+    parser.add_argument("--legacy-favorites", action="store_true",
+                        help="also exercise the per-id favorites endpoints")
+    parser.add_argument("-v", "--verbose", action="store_true",
+                        help="print each line as it happens instead of once at the end")
+    parser.add_argument("--latency-baseline", metavar="JSON",
+                        help='fail if an endpoint\'s p95 exceeds this file\'s limit, e.g. {"GET routes/public": 800}')
+    parser.add_argument("--no-cache", action="store_true",
+                        help=f"log in again instead of reusing the token cached in {TOKEN_CACHE_PATH}")
+    args = parser.parse_args(argv)
+    baseline = None
+    if args.latency_baseline:
+        with open(args.latency_baseline, "rb") as f:
+            baseline = orjson.loads(f.read())
+
+    if args.mock:
+        from backend_mock import MOCK_BASE_URL, mock_api
+        tester = HuntingSafetyAPITester(MOCK_BASE_URL, use_token_cache=False, verbose=args.verbose,
+                                        latency_baseline=baseline)
+        context = mock_api(tester.api_url)
+    else:
+        tester = HuntingSafetyAPITester(use_token_cache=not args.no_cache, verbose=args.verbose,
+                                        latency_baseline=baseline)
+        context = cassette("explore_routes.yaml", args.cassette)
+    with context:
+        success = tester.run_all_tests(legacy_favorites=args.legacy_favorites)
     return 0 if success else 1
 
 if __name__ == "__main__":
@@ -0,0 +1,25 @@
+import os
+
+import pytest
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--live", action="store_true",
+        help="also run the live API tests (they add and remove favorites on the target host)"
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "mocked: runs against the in-process respx stand-in (backend_mock.py)")
+    config.addinivalue_line("markers", "live: talks to a real RangeGuard API (RANGEGUARD_API or the preview host)")
+
+
+def pytest_collection_modifyitems(config, items):
+    # Live tests mutate real data, so they only run when a target is chosen explicitly
+    if config.getoption("--live") or os.environ.get("RANGEGUARD_API"):
+        return
+    skip_live = pytest.mark.skip(reason="live API test: pass --live or set RANGEGUARD_API")
+    for item in items:
+        if "live" in item.keywords:
+            item.add_marker(skip_live)
@@ -2,72 +2,119 @@
 """
 Quick test to investigate the intersection detection logic
 """
-import requests
-import json
+import argparse
+import httpx
+import orjson
+from concurrent.futures import ThreadPoolExecutor
 
-def test_intersection_logic():
-    api_url = "https://cotos-check.preview.emergentagent.com/api"
+from api_helpers import DEFAULT_BASE_URL as API_BASE_URL, cassette, make_client
+
+# Shared so every request reuses one keep-alive HTTP/2 connection
+CLIENT = make_client(timeout=30)
+
+TEST_ROUTES = [
+    {
+        "name": "Route 1: Very short inside",
+        "geometry": {
+            "type": "LineString",
+            "coordinates": [[-3.7, 40.45], [-3.69, 40.44]]
+        }
+    },
+    {
+        "name": "Route 2: Long crossing route", 
+        "geometry": {
+            "type": "LineString",
+            "coordinates": [[-4.0, 40.2], [-3.5, 40.8]]  # Much longer line crossing through
+        }
+    },
+    {
+        "name": "Route 3: Edge crossing",
+        "geometry": {
+            "type": "LineString", 
+            "coordinates": [[-3.85, 40.5], [-3.55, 40.3]]  # Starts outside, ends inside
+        }
+    }
+]
+
+# The probes never change, so their request bodies are serialized once at import
+_BATCH_BODY = orjson.dumps({"routes": [r['geometry'] for r in TEST_ROUTES]})
+_ROUTE_BODIES = [orjson.dumps({"route_geometry": r['geometry']}) for r in TEST_ROUTES]
+
+def test_intersection_logic(api_url=f"{API_BASE_URL}/api"):
     
     print("Testing different route geometries for intersection types...")
     
-    test_routes = [
-        {
-            "name": "Route 1: Very short inside",
-            "geometry": {
-                "type": "LineString",
-                "coordinates": [[-3.7, 40.45], [-3.69, 40.44]]
-            }
-        },
-        {
-            "name": "Route 2: Long crossing route", 
-            "geometry": {
-                "type": "LineString",
-                "coordinates": [[-4.0, 40.2], [-3.5, 40.8]]  # Much longer line crossing through
-            }
-        },
-        {
-            "name": "Route 3: Edge crossing",
-            "geometry": {
-                "type": "LineString", 
-                "coordinates": [[-3.85, 40.5], [-3.55, 40.3]]  # Starts outside, ends inside
-            }
-        }
-    ]
+    try:
+        results = check_all(api_url, _BATCH_BODY, _ROUTE_BODIES)
+    except Exception as e:
+        print(f"Exception: {str(e)}")
+        return
     
-    for test_route in test_routes:
-        print(f"\n{'='*60}")
-        print(f"Testing: {test_route['name']}")
-        print(f"Coordinates: {test_route['geometry']['coordinates']}")
-        
-        payload = {"route_geometry": test_route['geometry']}
-        
-        try:
-            response = requests.post(f"{api_url}/check-intersection", json=payload, timeout=30)
-            if response.status_code == 200:
-                data = response.json()
-                zones = data.get('zones', [])
-                intersects = data.get('intersects', False)
-                message = data.get('safe_message', '')
-                
-                print(f"Intersects: {intersects}")
-                print(f"Message: {message}")
-                print(f"Zones found: {len(zones)}")
-                
-                for i, zone in enumerate(zones):
-                    conflict_type = zone.get('conflict_type', 'unknown')
-                    overlap_pct = zone.get('overlap_percentage', 0)
-                    zone_name = zone.get('zone_name', 'Unknown')
-                    
-                    print(f"  Zone {i+1}: {zone_name}")
-                    print(f"    Conflict Type: {conflict_type}")
-                    print(f"    Overlap: {overlap_pct}%")
-            else:
-                print(f"API Error: {response.status_code} - {response.text}")
-                
-        except Exception as e:
-            print(f"Exception: {str(e)}")
+    for test_route, data in zip(TEST_ROUTES, results):
+        print_result(test_route, data)
     
     print(f"\n{'='*60}")
 
+def check_one(api_url, body):
+    """POST one serialized route to /check-intersection; returns the result, or an error line"""
+    try:
+        response = CLIENT.post(f"{api_url}/check-intersection", content=body)
+    except httpx.HTTPError as e:
+        return f"Exception: {str(e)}"
+    if response.status_code != 200:
+        return f"API Error: {response.status_code} - {response.text}"
+    return orjson.loads(response.content)
+
+def check_all(api_url, batch_body, route_bodies):
+    """Check all routes in one batched call. Hosts that predate /check-intersection/batch
+    get the single-route endpoint instead, with the calls made concurrently"""
+    response = CLIENT.post(f"{api_url}/check-intersection/batch", content=batch_body)
+    if response.status_code == 200:
+        return orjson.loads(response.content)['results']
+    if response.status_code not in (404, 405):
+        return [f"API Error: {response.status_code} - {response.text}"] * len(route_bodies)
+    with ThreadPoolExecutor(max_workers=len(route_bodies)) as pool:
+        return list(pool.map(lambda body: check_one(api_url, body), route_bodies))
+
+def print_result(test_route, data):
+    """Print one probe's outcome; data is the check result or an error line"""
+    print(f"\n{'='*60}")
+    print(f"Testing: {test_route['name']}")
+    print(f"Coordinates: {test_route['geometry']['coordinates']}")
+    
+    if isinstance(data, str):
+        print(data)
+        return
+    
+    zones = data.get('zones', [])
+    intersects = data.get('intersects', False)
+    message = data.get('safe_message', '')
+    
+    print(f"Intersects: {intersects}")
+    print(f"Message: {message}")
+    print(f"Zones found: {len(zones)}")
+    
+    for i, zone in enumerate(zones):
+        conflict_type = zone.get('conflict_type', 'unknown')
+        overlap_pct = zone.get('overlap_percentage', 0)
+        zone_name = zone.get('zone_name', 'Unknown')
+        
+        print(f"  Zone {i+1}: {zone_name}")
+        print(f"    Conflict Type: {conflict_type}")
+        print(f"    Overlap: {overlap_pct}%")
+
 if __name__ == "__main__":
-    test_intersection_logic()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description=__doc__)
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--cassette", action="store_true",
+                        help="record responses on the first run and replay them from disk afterwards (needs vcrpy)")
+    source.add_argument("--mock", action="store_true",
+                        help="run against the in-process respx stand-in from backend_mock.py instead of a server")
+    args = parser.parse_args()
+    if args.mock:
+        from backend_mock import MOCK_BASE_URL, mock_api
+        with mock_api(f"{MOCK_BASE_URL}/api"):
+            test_intersection_logic(f"{MOCK_BASE_URL}/api")
+    else:
+        with cassette("intersection_logic.yaml", args.cassette):
+            test_intersection_logic()
\ No newline at end of file
@@ -107,6 +107,18 @@ export default function ExplorePage() {
     }
   };
 
+  // The public listing omits geometry; load it when a route is selected
+  const selectRoute = async (route) => {
+    setSelectedRoute(route);
+    if (route.geometry) return;
+    try {
+      const res = await axios.get(`${API}/routes/${route.id}`);
+      setSelectedRoute(prev => (prev?.id === route.id ? { ...prev, geometry: res.data.geometry } : prev));
+    } catch (err) {
+      console.error(err);
+    }
+  };
+
   const routeList = tab === 'favorites' ? favorites.map(f => ({
     id: f.route_id,
     name: f.route_name,
@@ -187,7 +199,7 @@ export default function ExplorePage() {
                         ? 'border-blue-500 bg-blue-50/50 dark:bg-blue-950/20 shadow-md'
                         : 'border-stone-200 dark:border-stone-800'
                     }`}
-                    onClick={() => setSelectedRoute(route)}
+                    onClick={() => selectRoute(route)}
                     data-testid={`explore-route-${route.id}`}
                   >
                     <CardContent className="p-4">
@@ -0,0 +1,43 @@
+import pytest
+from shapely.geometry import box, mapping, shape
+from shapely.ops import transform
+
+import server
+
+
+def _metric(geom):
+    """Project a WGS84 shape into the same local CRS compute_buffer uses"""
+    centroid = geom.centroid
+    to_metric, _ = server.get_metric_transformers(server.metric_crs_for(centroid.x, centroid.y))
+    return transform(to_metric, geom)
+
+
+@pytest.mark.parametrize("lon, lat", [(-3.7, 40.4), (25.7, 66.5), (-70.6, -33.4)])
+@pytest.mark.parametrize("buffer_meters", [50, 200, 1000])
+def test_buffer_distance_is_metric(lon, lat, buffer_meters):
+    zone = box(lon, lat, lon + 0.02, lat + 0.01)
+    result = server.compute_buffer(mapping(zone), buffer_meters)
+
+    original = _metric(zone)
+    buffered = _metric(shape(result["buffered_geometry"]))
+    assert buffered.contains(original)
+    # Every point of the buffer's edge sits buffer_meters from the zone, at any latitude
+    assert buffered.exterior.hausdorff_distance(original.exterior) == pytest.approx(buffer_meters, rel=0.01)
+    assert original.exterior.distance(buffered.exterior) == pytest.approx(buffer_meters, rel=0.01)
+
+
+def test_bounding_boxes():
+    zone = box(-3.7, 40.4, -3.68, 40.41)
+    result = server.compute_buffer(mapping(zone), 200)
+
+    assert result["bbox"] == pytest.approx(list(zone.bounds))
+    assert result["buffered_bbox"] == pytest.approx(list(shape(result["buffered_geometry"]).bounds))
+    min_x, min_y, max_x, max_y = result["buffered_bbox"]
+    assert min_x < -3.7 and min_y < 40.4 and max_x > -3.68 and max_y > 40.41
+
+
+def test_invalid_geometry_falls_back_to_input():
+    geometry = {"type": "Polygon", "coordinates": "not coordinates"}
+    result = server.compute_buffer(geometry, 200)
+
+    assert result == {"buffered_geometry": geometry, "bbox": None, "buffered_bbox": None}
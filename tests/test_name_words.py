@@ -0,0 +1,32 @@
+import re
+
+import pytest
+
+import server
+
+
+@pytest.mark.parametrize("name, words", [
+    ("Sierra Norte loop", ["sierra", "norte", "loop"]),
+    ("  Sierra   NORTE  ", ["sierra", "norte"]),
+    ("Peñalara - Cabezas de Hierro", ["peñalara", "cabezas", "de", "hierro"]),
+    ("Ruta (GR-10), etapa 3/4", ["ruta", "gr", "10", "etapa", "3", "4"]),
+    ("morning_walk.gpx", ["morning_walk", "gpx"]),
+    ("", []),
+    ("--- ...", []),
+])
+def test_tokenization(name, words):
+    assert server.name_words(name) == words
+
+
+def test_search_terms_prefix_stored_words():
+    # Search tokenizes the query the same way and anchors each term at a word start
+    stored = server.name_words("Peñalara - Cabezas de Hierro")
+
+    def matches(search):
+        terms = server.name_words(search)
+        return all(any(re.match("^" + re.escape(t), word) for word in stored) for t in terms)
+
+    assert matches("PEÑA")
+    assert matches("hierro cabe")
+    assert not matches("alara")
+    assert not matches("hierro norte")
@@ -0,0 +1,36 @@
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+
+import server
+
+
+@pytest.mark.parametrize("value", [
+    "2025-10-12T06:00:00Z",
+    "2025-10-12T06:00:00+00:00",
+    "2025-10-12T08:00:00+02:00",
+    "2025-10-12T01:00:00-05:00",
+    "2025-10-12T06:00:00",
+])
+def test_parses_to_aware_utc(value):
+    parsed = server.parse_time(value)
+    assert parsed.tzinfo is not None
+    assert parsed.utcoffset().total_seconds() == 0
+    assert parsed == datetime(2025, 10, 12, 6, tzinfo=timezone.utc)
+
+
+def test_naive_is_taken_as_utc():
+    assert server.parse_time("2025-10-12T06:00:00.250") == datetime(2025, 10, 12, 6, 0, 0, 250000, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize("value", ["", "tomorrow", "2025-13-01T00:00:00", "12/10/2025 06:00"])
+def test_invalid_raises_value_error(value):
+    with pytest.raises(ValueError):
+        server.parse_time(value)
+
+
+def test_zone_times_reject_invalid_with_400():
+    with pytest.raises(HTTPException) as exc:
+        server.parse_zone_times("2025-10-12T06:00:00Z", "not a date")
+    assert exc.value.status_code == 400
@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+import server
+
+
+class _Redis:
+    """Just enough of redis.asyncio.Redis (decode_responses=True) for redis_get_json"""
+
+    def __init__(self, values, fail=False):
+        self.values = values
+        self.fail = fail
+
+    async def get(self, key):
+        if self.fail:
+            raise ConnectionError("redis down")
+        return self.values.get(key)
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    def use(values, fail=False):
+        monkeypatch.setattr(server, "redis_client", _Redis(values, fail))
+    return use
+
+
+def test_disabled_is_a_miss(monkeypatch):
+    monkeypatch.setattr(server, "redis_client", None)
+    assert asyncio.run(server.redis_get_json("auth:x")) is None
+
+
+def test_decodes_stored_json(redis):
+    redis({"zones:active:now:1": '[{"id": "z1"}]'})
+    assert asyncio.run(server.redis_get_json("zones:active:now:1")) == [{"id": "z1"}]
+    assert asyncio.run(server.redis_get_json("zones:active:now:2")) is None
+
+
+@pytest.mark.parametrize("raw", ["{not json", "", "\x80\x81"])
+def test_corrupt_value_is_a_miss(redis, raw):
+    redis({"auth:x": raw})
+    assert asyncio.run(server.redis_get_json("auth:x")) is None
+
+
+def test_redis_failure_is_a_miss(redis):
+    redis({}, fail=True)
+    assert asyncio.run(server.redis_get_json("auth:x")) is None
@@ -0,0 +1,95 @@
+import random
+
+import pytest
+from shapely.geometry import LineString, box, mapping, shape
+
+import server
+
+
+def _zone(zone_id, geom, buffer_meters=200, stored_bbox=True):
+    doc = {"id": zone_id, "geometry": mapping(geom), "created_at": "2025-01-01T00:00:00+00:00"}
+    buffered = server.compute_buffer(doc["geometry"], buffer_meters)
+    doc["buffered_geometry"] = buffered["buffered_geometry"]
+    if stored_bbox:
+        doc["buffered_bbox"] = buffered["buffered_bbox"]
+    return doc
+
+
+def _scalar_overlaps(route, zones):
+    """Reference: one zone at a time with plain shapely predicates"""
+    expected = []
+    for zone in zones:
+        original, buffered = shape(zone["geometry"]), shape(zone["buffered_geometry"])
+        if not buffered.intersects(route):
+            continue
+        if buffered.contains(route) or original.contains(route):
+            expected.append((zone["id"], True, 100.0))
+        else:
+            pct = min(round(route.intersection(buffered).length / (route.length or 1) * 100, 1), 100)
+            expected.append((zone["id"], False, pct))
+    return expected
+
+
+@pytest.fixture(scope="module")
+def zones():
+    rng = random.Random(7)
+    docs = []
+    for i in range(40):
+        lon, lat = -4 + rng.random(), 40 + rng.random()
+        docs.append(_zone(f"z{i}", box(lon, lat, lon + rng.uniform(0.01, 0.2), lat + rng.uniform(0.01, 0.2)),
+                          buffer_meters=rng.choice([0, 100, 200, 500]), stored_bbox=i % 3 != 0))
+    return docs
+
+
+def test_matches_scalar_path(zones):
+    rng = random.Random(11)
+    for _ in range(200):
+        points = [(-4 + rng.random(), 40 + rng.random())]
+        for _ in range(rng.randint(1, 6)):
+            points.append((points[-1][0] + rng.uniform(-0.05, 0.05), points[-1][1] + rng.uniform(-0.05, 0.05)))
+        route = LineString(points)
+
+        result = [(zone["id"], contained, pct) for zone, contained, pct in server.find_zone_overlaps(route, zones)]
+        expected = _scalar_overlaps(route, zones)
+        assert [(z, c) for z, c, _ in result] == [(z, c) for z, c, _ in expected]
+        assert [p for _, _, p in result] == pytest.approx([p for _, _, p in expected], abs=0.1)
+
+
+def test_contained_partial_and_clear():
+    zone = _zone("square", box(-3.8, 40.4, -3.7, 40.5))
+
+    inside = LineString([(-3.79, 40.41), (-3.71, 40.49)])
+    assert [(c, p) for _, c, p in server.find_zone_overlaps(inside, [zone])] == [(True, 100.0)]
+
+    # Half of the route lies inside the zone plus roughly 200 m of buffer on the way out
+    crossing = LineString([(-3.75, 40.45), (-3.65, 40.45)])
+    [(_, contained, pct)] = server.find_zone_overlaps(crossing, [zone])
+    assert not contained
+    assert 50 < pct < 55
+
+    far = LineString([(-3.0, 41.0), (-2.9, 41.1)])
+    assert server.find_zone_overlaps(far, [zone]) == []
+    assert server.find_zone_overlaps(far, []) == []
+
+
+def test_invalid_zone_is_skipped():
+    good = _zone("good", box(-3.8, 40.4, -3.7, 40.5))
+    bad = {"id": "bad", "geometry": {"type": "Polygon", "coordinates": "broken"},
+           "created_at": "2025-01-01T00:00:00+00:00", "buffered_bbox": [-3.8, 40.4, -3.7, 40.5]}
+    route = LineString([(-3.79, 40.41), (-3.71, 40.49)])
+    assert [zone["id"] for zone, _, _ in server.find_zone_overlaps(route, [bad, good])] == ["good"]
+
+
+def test_new_zone_batch_matches_find_zone_overlaps(zones):
+    # The new-zone scan classifies a batch of routes against one zone from WKB copies
+    rng = random.Random(3)
+    routes = []
+    for _ in range(200):
+        lon, lat = -4 + rng.random(), 40 + rng.random()
+        routes.append(LineString([(lon, lat), (lon + rng.uniform(-0.02, 0.02), lat + rng.uniform(-0.02, 0.02))]))
+    for zone in zones[:10]:
+        original, _, buffered, _ = server.get_zone_shapes(zone)
+        result = server.overlaps_against_zone(routes, original.wkb, buffered.wkb)
+        for route, got in zip(routes, result):
+            expected = [("contained" if c else "intersects", pct) for _, c, pct in server.find_zone_overlaps(route, [zone])]
+            assert ([got] if got else []) == expected